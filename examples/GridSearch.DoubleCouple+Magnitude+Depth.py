@@ -140,6 +140,7 @@ if __name__=='__main__':
     #
 
     from mpi4py import MPI
+    from mtuq.util.mpi import bcast_traces_multi
     comm = MPI.COMM_WORLD
     rank = comm.rank
     nproc = comm.Get_size()
@@ -180,10 +181,8 @@ if __name__=='__main__':
 
 
     stations = comm.bcast(stations, root=0)
-    data_bw = comm.bcast(data_bw, root=0)
-    data_sw = comm.bcast(data_sw, root=0)
-    greens_bw = comm.bcast(greens_bw, root=0)
-    greens_sw = comm.bcast(greens_sw, root=0)
+    data_bw, data_sw, greens_bw, greens_sw = bcast_traces_multi(
+        comm, [data_bw, data_sw, greens_bw, greens_sw])
 
 
     #
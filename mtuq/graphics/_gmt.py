@@ -7,7 +7,6 @@ import subprocess
 
 from matplotlib.colors import LinearSegmentedColormap, hsv_to_rgb, Normalize
 from mtuq.util import fullpath, warn
-from mtuq.util.math import wrap_180
 from os.path import splitext
 
 
@@ -19,7 +19,11 @@ import matplotlib.pyplot as pyplot
 import numpy as np
 import shutil
 import subprocess
+import tempfile
 
+from functools import lru_cache
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 from mtuq.event import MomentTensor
 from mtuq.util import warn
 
@@ -83,6 +87,11 @@ def beachball_gmt(filename, mt):
 def beachball_obspy(filename, mt):
     """ Plots focal mechanism using ObsPy
     """
+    fig = _beachball_obspy(mt)
+    fig.savefig(filename)
+
+
+def _beachball_obspy(mt):
     warn("""
         WARNING
 
@@ -95,11 +104,80 @@ def beachball_obspy(filename, mt):
         https://github.com/obspy/obspy/issues/2388
         """)
 
-    obspy.imaging.beachball.beachball(
-        mt.as_vector(), size=200, linewidth=2, facecolor=gray)
+    # rather than creating a new figure each time, clears and reuses the
+    # same offscreen figure
+    fig = _get_figure()
+    fig.clear()
+    fig.subplots_adjust(left=0, bottom=0, right=1, top=1)
 
-    pyplot.savefig(filename)
-    pyplot.close()
+    return obspy.imaging.beachball.beachball(
+        mt.as_vector(), size=200, linewidth=2, facecolor=gray, fig=fig)
+
+
+@lru_cache(maxsize=1)
+def _get_figure():
+    # offscreen figure used by the ObsPy fallback, matching the size ObsPy
+    # uses by default
+    fig = Figure(figsize=(2, 2), dpi=100)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def _render_beachball(mt):
+    """ Returns focal mechanism of given moment tensor as an RGBA image array
+
+    Like ``plot_beachball``, but without leaving files behind.  The ObsPy
+    fallback is rendered in memory, skipping PNG encoding and decoding. GMT
+    can only write to disk, so it works in a private temporary directory,
+    which also keeps concurrent processes from overwriting each other's images.
+
+    Images are cached, so that the same moment tensor is rendered only once
+    no matter how many figures it appears in.
+    """
+    if type(mt)!=MomentTensor:
+        mt = MomentTensor(mt)
+
+    return _render_beachball_cached(tuple(mt.as_vector().tolist()))
+
+
+@lru_cache(maxsize=128)
+def _render_beachball_cached(mt):
+    from mtuq.graphics._gmt import gmt_major_version
+
+    mt = MomentTensor(mt)
+    image = None
+
+    if (gmt_major_version() or 0) >= 6:
+        try:
+            with tempfile.TemporaryDirectory() as dirname:
+                filename = os.path.join(dirname, 'beachball')
+                beachball_gmt(filename, mt)
+                image = _imread(filename+'.png')
+
+        except (OSError, subprocess.SubprocessError):
+            # GMT failed to run or did not write an image
+            image = None
+
+    if image is None:
+        fig = _beachball_obspy(mt)
+        fig.canvas.draw()
+        image = np.array(fig.canvas.buffer_rgba())
+
+    # cached images are shared, so must not be modified
+    image.flags.writeable = False
+    return image
+
+
+def _imread(filename):
+    # reads PNG as 8-bit RGBA, which is faster and takes a quarter of the
+    # memory of the floating point array returned by pyplot.imread
+    try:
+        from PIL import Image
+    except ImportError:
+        return pyplot.imread(filename)
+
+    with Image.open(filename) as image:
+        return np.asarray(image.convert('RGBA'))
 
 
 
@@ -119,6 +197,10 @@ def misfit_vs_depth(filename, data, misfit, origins, grid, results):
     fig = pyplot.figure()
     ax = pyplot.gca()
 
+    # grid search results have one dimension for each source parameter,
+    # followed by origin_idx, so are flattened to shape (nsources, norigins)
+    results = np.reshape(np.asarray(results), (-1, len(origins)))
+
   # normalize results
     norm = 0
     for stream in data:
@@ -129,7 +211,7 @@ def misfit_vs_depth(filename, data, misfit, origins, grid, results):
                 norm += np.sum(trace.data**2)
             elif misfit.norm=='hybrid':
                 norm += np.sum(trace.data**2)**0.5
-    results /= norm
+    results = results/norm
 
     # what is the minimum result for each depth?
     indices = results.argmin(axis=0)
@@ -143,8 +225,24 @@ def misfit_vs_depth(filename, data, misfit, origins, grid, results):
     for origin in origins:
         depths += [origin.depth_in_m/1000.]
 
-    xr = max(depths) - min(depths)
-    yr = results.max() - results.min()
+    xr = float(max(depths) - min(depths))
+    yr = float(results.max() - results.min())
+
+    # a single origin or equal misfits would otherwise give zero-size
+    # beachballs and collapsed axis limits
+    xr = xr or 1.
+    yr = yr or 1.
+
+    xlim = (-0.1*xr + min(depths), 0.1*xr + max(depths))
+    ylim = (-0.1*yr + results.min(), 0.1*yr + results.max())
+
+    # width-to-height ratio of axes, used to keep beachballs circular
+    bbox = ax.get_position()
+    aspect = (bbox.width*fig.get_figwidth())/(bbox.height*fig.get_figheight())
+
+    # beachball half-widths, as fractions of the axis ranges
+    xw = (xlim[1] - xlim[0])/24.
+    yw = (ylim[1] - ylim[0])/24.*aspect
 
     for _i, origin in enumerate(origins):
 
@@ -156,21 +254,17 @@ def misfit_vs_depth(filename, data, misfit, origins, grid, results):
         pyplot.plot(xp, yp)
 
         # add beachball
-        plot_beachball('tmp.png', mt)
-        img = pyplot.imread('tmp.png')
-        os.remove('tmp.png')
-        os.remove('tmp.ps')
-
-        xw = 0.1*xr
-        yw = 0.1*yr
-        #ax.imshow(img, extent=(xp-xw,xp+xw,yp-yw,yp+yw), transform=ax.transAxes)
+        # (drawn directly on the main axes in data coordinates, rather than
+        # on separate axes)
+        img = _render_beachball(mt)
+        ax.imshow(img, extent=(xp-xw,xp+xw,yp-yw,yp+yw), aspect='auto')
 
         # add magnitude label
         label = '%2.1f' % mt.magnitude()
-        _text(xp, yp-0.075*yr, label)
+        _text(xp, yp-yw-0.025*(ylim[1] - ylim[0]), label)
 
-    pyplot.xlim((-0.1*xr + min(depths), 0.1*xr + max(depths)))
-    pyplot.ylim((-0.1*yr + results.min(), 0.1*yr + results.max()))
+    pyplot.xlim(xlim)
+    pyplot.ylim(ylim)
 
     pyplot.xlabel('Depth (km)')
     pyplot.ylabel('Normalized misfit')
@@ -5,11 +5,10 @@
 
 
 import numpy as np
-import os
-from matplotlib import pyplot
+from functools import lru_cache
 from matplotlib.font_manager import FontProperties
 from mtuq.event import MomentTensor
-from mtuq.graphics.beachball import gray, plot_beachball
+from mtuq.graphics.beachball import gray, _render_beachball
 from mtuq.util.math import to_delta_gamma
 from obspy.core import AttribDict
 
@@ -25,6 +24,7 @@ class Base(object):
         """ Returns matplotlib axes of given height along top of figure
         """
         if fig is None:
+            from matplotlib import pyplot
             fig = pyplot.gcf()
         width, figure_height = fig.get_size_inches()
 
@@ -40,12 +40,7 @@ class Base(object):
         ax.set_ylim([0., height])
 
         # hides axes lines, ticks, and labels
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
-        ax.spines['bottom'].set_visible(False)
-        ax.spines['left'].set_visible(False)
-        ax.get_xaxis().set_ticks([])
-        ax.get_yaxis().set_ticks([])
+        ax.set_axis_off()
 
         return ax
 
@@ -54,6 +49,39 @@ class Base(object):
         raise NotImplementedError("Must be implemented by subclass")
 
 
+    def _set_passbands(self, process_bw, process_sw):
+        """ Formats body and surface wave passbands
+        """
+        if not process_sw:
+            raise Exception()
+
+        # both passbands are given either in Hz or in s, depending on the
+        # surface wave frequencies
+        if process_sw.freq_max > 1.:
+            units = 'Hz'
+        else:
+            units = 's'
+
+        if process_bw:
+            self.passband_bw = _passband(process_bw, units)
+
+        self.passband_sw = _passband(process_sw, units)
+
+
+    def _get_passband_line(self):
+        """ Returns header line describing passbands and window lengths
+        """
+        if self.process_bw and self.process_sw:
+            return ('body waves:  %s (%.1f s),  ' +\
+                    'surface waves: %s (%.1f s)') %\
+                    (self.passband_bw, self.process_bw.window_length,
+                     self.passband_sw, self.process_sw.window_length)
+
+        else:
+            return 'passband: %s,  window length: %.1f s ' %\
+                    (self.passband_sw, self.process_sw.window_length)
+
+
 
 class TextHeader(Base):
     """ Prints header text from a list ((xp, yp, text), ...)
@@ -70,6 +98,10 @@ class TextHeader(Base):
 
 
     def write(self, height, width, margin_left, margin_top):
+        # avoids creating an empty axis if there is nothing to write
+        if not self.items:
+            return
+
         ax = self._get_axis(height)
 
         for item in self.items:
@@ -101,14 +133,7 @@ class MomentTensorHeader(Base):
         self.origin = origin
         self.magnitude = mt.magnitude()
 
-        depth_in_m = origin.depth_in_m
-        depth_in_km = origin.depth_in_m/1000.
-        if depth_in_m < 1000.:
-            self.depth_str = '%.0f m' % depth_in_m
-        elif depth_in_km <= 100.:
-            self.depth_str = '%.1f km' % depth_in_km
-        else:
-            self.depth_str = '%.0f km' % depth_in_km
+        self.depth_str = _depth(origin)
 
 
         self.model = model
@@ -126,31 +151,7 @@ class MomentTensorHeader(Base):
         self.best_misfit_sw = best_misfit_sw
         self.best_misfit = self.best_misfit_bw + self.best_misfit_sw
 
-        if not process_bw:
-            pass
-        if not process_sw:
-            raise Excpetion()
-
-        if process_sw.freq_max > 1.:
-            units = 'Hz'
-        else:
-            units = 's'
-
-        if process_bw and units=='Hz':
-            self.passband_bw = '%.1f - %.1f Hz' %\
-                (process_bw.freq_min, process_bw.freq_max)
-
-        elif process_bw and units=='s':
-            self.passband_bw = '%.1f - %.1f s' %\
-                (process_bw.freq_max**-1, process_bw.freq_min**-1)
-
-        if process_sw and units=='Hz':
-            self.passband_sw = '%.1f - %.1f Hz' %\
-                (process_sw.freq_min, process_sw.freq_max)
-
-        elif process_sw and units=='s':
-            self.passband_sw = '%.1f - %.1f s' %\
-                (process_sw.freq_max**-1, process_sw.freq_min**-1)
+        self._set_passbands(process_bw, process_sw)
 
 
     def display_source(self, ax, height, width, offset):
@@ -180,70 +181,59 @@ class MomentTensorHeader(Base):
         xp = offset
         yp = 0.075*height
 
-        plot_beachball('tmp.png', self.mt)
-        img = pyplot.imread('tmp.png')
-
-        try:
-            os.remove('tmp.png')
-            os.remove('tmp.ps')
-        except:
-            pass
+        img = _render_beachball(self.mt)
 
         ax.imshow(img, extent=(xp,xp+diameter,yp,yp+diameter))
 
 
-    def write(self, height, width, margin_left, margin_top):
-        """ Writes header text to current figure
+    def get_lines(self):
+        """ Returns formatted header text as a list of lines
         """
-        ax = self._get_axis(height)
+        # text only depends on attributes set in the constructor, so it is
+        # formatted once and reused if the header is written more than once
+        if getattr(self, '_lines', None) is not None:
+            return self._lines
 
-        self.display_source(ax, height, width, margin_left)
+        lines = []
 
-        px = 2.*margin_left + 0.75*height
-        py = height - margin_top
-
-        # write text line #1
-        px += 0.00
-        py -= 0.35
-
-        line = '%s  %s  $M_w$ %.2f  Depth %s' % (
-            self.event_name, _lat_lon(self.origin), self.magnitude, self.depth_str)
-        _write_bold(line, px, py, ax, fontsize=16.5)
+        lines += ['%s  %s  $M_w$ %.2f  Depth %s' % (
+            self.event_name, _lat_lon(self.origin), self.magnitude, self.depth_str)]
 
+        lines += [u'model: %s   solver: %s   misfit (%s): %.1e' % \
+                (self.model, self.solver, self.norm, self.best_misfit)]
 
-        # write text line #2
-        px += 0.00
-        py -= 0.30
+        lines += [self._get_passband_line()]
 
-        line = u'model: %s   solver: %s   misfit (%s): %.1e' % \
-                (self.model, self.solver, self.norm, self.best_misfit)
-        _write_text(line, px, py, ax, fontsize=14)
+        lines += [_focal_mechanism(self.lune_dict) + ',   ' +\
+                  _delta_gamma(self.lune_dict)]
 
+        self._lines = lines
+        return lines
 
-        # write text line #3
-        px += 0.00
-        py -= 0.30
 
-        if self.process_bw and self.process_bw:
-            line = ('body waves:  %s (%.1f s),  ' +\
-                    'surface waves: %s (%.1f s)') %\
-                    (self.passband_bw, self.process_bw.window_length,
-                     self.passband_sw, self.process_sw.window_length)
+    def write(self, height, width, margin_left, margin_top):
+        """ Writes header text to current figure
+        """
+        lines = self.get_lines()
 
-        elif self.process_sw:
-            line = 'passband: %s,  window length: %.1f s ' %\
-                    (self.passband_sw, self.process_sw.window_length)
+        ax = self._get_axis(height)
 
-        _write_text(line, px, py, ax, fontsize=14)
+        self.display_source(ax, height, width, margin_left)
 
+        px = 2.*margin_left + 0.75*height
+        py = height - margin_top
 
-        # write text line #4
+        # write text line #1
         px += 0.00
-        py -= 0.30
+        py -= 0.35
+        _write_bold(lines[0], px, py, ax, fontsize=16.5)
+
 
-        line = _focal_mechanism(self.lune_dict)
-        line +=  ',   '+_delta_gamma(self.lune_dict)
-        _write_text(line, px, py, ax, fontsize=14)
+        # write text lines #2-4
+        for line in lines[1:]:
+            px += 0.00
+            py -= 0.30
+            _write_text(line, px, py, ax, fontsize=14)
 
 
 class ForceHeader(Base):
@@ -264,14 +254,7 @@ class ForceHeader(Base):
         self.event_name = event_name
         self.origin = origin
 
-        depth_in_m = origin.depth_in_m
-        depth_in_km = origin.depth_in_m/1000.
-        if depth_in_m < 1000.:
-            self.depth_str = '%.0f m' % depth_in_m
-        elif depth_in_km <= 100.:
-            self.depth_str = '%.1f km' % depth_in_km
-        else:
-            self.depth_str = '%.0f km' % depth_in_km
+        self.depth_str = _depth(origin)
 
         self.model = model
         self.solver = solver
@@ -288,34 +271,37 @@ class ForceHeader(Base):
         self.best_misfit_sw = best_misfit_sw
         self.best_misfit = self.best_misfit_bw + self.best_misfit_sw
 
-        if not process_bw:
-            pass
-        if not process_sw:
-            raise Excpetion()
+        self._set_passbands(process_bw, process_sw)
 
-        if process_sw.freq_max > 1.:
-            units = 'Hz'
-        else:
-            units = 's'
 
-        if process_bw and units=='Hz':
-            self.passband_bw = '%.1f - %.1f Hz' %\
-                (process_bw.freq_min, process_bw.freq_max)
+    def get_lines(self):
+        """ Returns formatted header text as a list of lines
+        """
+        # text only depends on attributes set in the constructor, so it is
+        # formatted once and reused if the header is written more than once
+        if getattr(self, '_lines', None) is not None:
+            return self._lines
+
+        lines = []
+
+        lines += ['%s  %s  $F$ %.2e N   Depth %s' % (
+            self.event_name, _lat_lon(self.origin), self.force_dict['F0'], self.depth_str)]
 
-        elif process_bw and units=='s':
-            self.passband_bw = '%.1f - %.1f s' %\
-                (process_bw.freq_max**-1, process_bw.freq_min**-1)
+        lines += [u'model: %s   solver: %s   misfit (%s): %.1e' % \
+                (self.model, self.solver, self.norm, self.best_misfit)]
 
-        if process_sw and units=='Hz':
-            self.passband_sw = '%.1f - %.1f Hz' %\
-                (process_sw.freq_min, process_sw.freq_max)
+        lines += [self._get_passband_line()]
 
-        elif process_sw and units=='s':
-            self.passband_sw = '%.1f - %.1f s' %\
-                (process_sw.freq_max**-1, process_sw.freq_min**-1)
+        lines += [_phi_theta(self.force_dict)]
+
+        self._lines = lines
+        return lines
 
 
     def write(self, height, width, margin_left, margin_top):
+        """ Writes header text to current figure
+        """
+        lines = self.get_lines()
 
         ax = self._get_axis(height)
 
@@ -326,71 +312,56 @@ class ForceHeader(Base):
         # write text line #1
         px += 0.00
         py -= 0.35
-
-        line = '%s  %s  $F$ %.2e N   Depth %s' % (
-            self.event_name, _lat_lon(self.origin), self.force_dict['F0'], self.depth_str)
-        _write_bold(line, px, py, ax, fontsize=16)
-
-
-        # write text line #2
-        px += 0.00
-        py -= 0.30
-
-        line = u'model: %s   solver: %s   misfit (%s): %.1e' % \
-                (self.model, self.solver, self.norm, self.best_misfit)
-        _write_text(line, px, py, ax, fontsize=14)
+        _write_bold(lines[0], px, py, ax, fontsize=16)
 
 
-        # write text line #3
-        px += 0.00
-        py -= 0.30
+        # write text lines #2-4
+        for line in lines[1:]:
+            px += 0.00
+            py -= 0.30
+            _write_text(line, px, py, ax, fontsize=14)
 
-        if self.process_bw and self.process_bw:
-            line = ('body waves:  %s (%.1f s),  ' +\
-                    'surface waves: %s (%.1f s) ') %\
-                    (self.passband_bw, self.process_bw.window_length,
-                     self.passband_sw, self.process_sw.window_length)
-
-        elif self.process_sw:
-            line = 'passband: %s,  window length: %.1f s ' %\
-                    (self.passband_sw, self.process_sw.window_length)
 
-        _write_text(line, px, py, ax, fontsize=14)
+    def display_source(self):
+        raise NotImplementedError
 
 
-        # write text line #4
-        px += 0.00
-        py -= 0.30
 
-        line = _phi_theta(self.force_dict)
-        _write_text(line, px, py, ax, fontsize=14)
+def _passband(process, units):
+    if units=='Hz':
+        return '%.1f - %.1f Hz' % (process.freq_min, process.freq_max)
+    else:
+        return '%.1f - %.1f s' % (process.freq_max**-1, process.freq_min**-1)
 
 
-    def display_source(self):
-        raise NotImplementedError
-
+# format strings indexed by hemisphere
+_LAT = (u'%.2f\N{DEGREE SIGN}N', u'%.2f\N{DEGREE SIGN}S')
+_LON = (u'% .2f\N{DEGREE SIGN}E', u'% .2f\N{DEGREE SIGN}W')
 
 
 def _lat_lon(origin):
-    if origin.latitude >= 0:
-        latlon = '%.2f%s%s' % (+origin.latitude, u'\N{DEGREE SIGN}', 'N')
-    else:
-        latlon = '%.2f%s%s' % (-origin.latitude, u'\N{DEGREE SIGN}', 'S')
-
-    if origin.longitude > 0:
-        latlon += '% .2f%s%s' % (+origin.longitude, u'\N{DEGREE SIGN}', 'E')
+    return (
+        _LAT[origin.latitude < 0] % abs(origin.latitude) +
+        _LON[origin.longitude <= 0] % abs(origin.longitude))
+
+
+def _depth(origin):
+    depth_in_m = origin.depth_in_m
+    depth_in_km = origin.depth_in_m/1000.
+    if depth_in_m < 1000.:
+        return '%.0f m' % depth_in_m
+    elif depth_in_km <= 100.:
+        return '%.1f km' % depth_in_km
     else:
-        latlon += '% .2f%s%s' % (-origin.longitude, u'\N{DEGREE SIGN}', 'W')
-
-    return latlon
+        return '%.0f km' % depth_in_km
 
 
 def _focal_mechanism(lune_dict):
     strike = lune_dict['kappa']
 
-    try:
+    if 'h' in lune_dict:
         dip = np.degrees(np.arccos(lune_dict['h']))
-    except:
+    else:
         dip = lune_dict['theta']
 
     slip = lune_dict['sigma']
@@ -400,10 +371,9 @@ def _focal_mechanism(lune_dict):
 
 
 def _delta_gamma(lune_dict):
-    try:
-        v, w = lune_dict['v'], lune_dict['w']
-        delta, gamma = to_delta_gamma(v, w)
-    except:
+    if 'v' in lune_dict and 'w' in lune_dict:
+        delta, gamma = to_delta_gamma(lune_dict['v'], lune_dict['w'])
+    else:
         delta, gamma = lune_dict['delta'], lune_dict['gamma']
 
     return 'lune coords %s  %s:  %d  %d' % (u'\u03B3', u'\u03B4', delta, gamma)
@@ -411,28 +381,37 @@ def _delta_gamma(lune_dict):
 
 
 def _phi_theta(force_dict):
-    try:
-        phi, theta = force_dict['phi'], force_dict['theta']
-    except:
-        phi, h = force_dict['phi'], force_dict['h']
-        theta = np.degrees(np.arccos(h))
+    phi = force_dict['phi']
+
+    if 'theta' in force_dict:
+        theta = force_dict['theta']
+    else:
+        theta = np.degrees(np.arccos(force_dict['h']))
 
     return '%s  %s:  %d  %d' % (u'\u03C6', u'\u03B8', phi, theta)
 
 
 def _write_text(text, x, y, ax, fontsize=12, **kwargs):
-    pyplot.text(x, y, text, fontsize=fontsize, **kwargs)
+    ax.text(x, y, text, fontsize=fontsize, **kwargs)
 
 
 def _write_bold(text, x, y, ax, fontsize=14):
-    font = FontProperties()
-    #font.set_weight('bold')
-    pyplot.text(x, y, text, fontproperties=font, fontsize=fontsize)
+    #font = _get_font(weight='bold')
+    font = _get_font()
+    ax.text(x, y, text, fontproperties=font, fontsize=fontsize)
 
 
 def _write_italic(text, x, y, ax, fontsize=12):
-    font = FontProperties()
-    font.set_style('italic')
-    pyplot.text(x, y, text, fontproperties=font, fontsize=fontsize)
+    font = _get_font(style='italic')
+    ax.text(x, y, text, fontproperties=font, fontsize=fontsize)
+
 
+@lru_cache(maxsize=16)
+def _get_font(style='normal', weight='normal'):
+    # matplotlib copies font properties when creating text, so a single 
+    # instance can be shared, rather than creating a new one for each call
+    font = FontProperties()
+    font.set_style(style)
+    font.set_weight(weight)
+    return font
 
@@ -1,6 +1,8 @@
 import os
+import numpy as np
 
 from matplotlib import pyplot
+from matplotlib.collections import LineCollection
 from os.path import join
 
 from mtuq.graphics.waveforms import _set_components, _prepare_synthetics
@@ -113,15 +115,21 @@ def _save_figure(filename, time_shifts, stations, origin, source,
     pyplot.figure()
 
     # plot "spider lines"
-    for station in stations:
-        pyplot.plot(
-            [origin.longitude, station.longitude],
-            [origin.latitude, station.latitude],
-            marker=None,
-            color='black',
-            linestyle='-',
-            linewidth=0.5,
-            )
+    # (all lines are drawn as a single collection rather than as separate
+    # artists)
+    nstations = len(stations)
+    segments = np.empty((nstations, 2, 2))
+    segments[:, 0, 0] = origin.longitude
+    segments[:, 0, 1] = origin.latitude
+    segments[:, 1, 0] = [station.longitude for station in stations]
+    segments[:, 1, 1] = [station.latitude for station in stations]
+
+    pyplot.gca().add_collection(LineCollection(
+        segments,
+        colors='black',
+        linestyles='-',
+        linewidths=0.5,
+        ))
 
     # plot stations
     pyplot.scatter(
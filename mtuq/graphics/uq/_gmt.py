@@ -208,10 +208,7 @@ def _parse_cpt(cpt_name):
 
 def _parse_force(force):
     phi = force[0]
-    if phi + 90 > 180.:
-        lon = phi - 270.
-    else:
-        lon = phi + 90.
+    lon = float(wrap_180(phi + 90.))
 
     h = force[1]
     lat = np.degrees(np.pi/2 - np.arccos(h))
@@ -350,13 +350,31 @@ def _bin(df, handle, npts_phi=60, npts_h=30):
     phi = closed_interval(0., 360, npts_phi+1)
     h = closed_interval(-1., +1., npts_h+1)
 
+    # which cells does each grid point lie within? (a single pass over the
+    # grid, rather than a separate pass for each cell)
+    first_h, last_h = _locate(df['h'], h)
+    first_phi, last_phi = _locate(df['phi'], phi)
+
+    # a point on the edge between cells lies within both, so is paired with
+    # up to four cells
+    rows, cells = [], []
+    for _di in (0, 1):
+        for _dj in (0, 1):
+            _i, _j = first_h+_di, first_phi+_dj
+            mask = (_i <= last_h) & (_j <= last_phi)
+            rows += [np.flatnonzero(mask)]
+            cells += [_i[mask]*npts_phi + _j[mask]]
+    rows, cells = np.concatenate(rows), np.concatenate(cells)
+
+    # rows of each cell, in their original order
+    order = np.lexsort((rows, cells))
+    keys, starts = np.unique(cells[order], return_index=True)
+    groups = dict(zip(keys, np.split(rows[order], starts[1:])))
+
     binned = np.empty((npts_h, npts_phi))
     for _i in range(npts_h):
         for _j in range(npts_phi):
-            # which grid points lie within cell (i,j)?
-            subset = df.loc[
-                df['phi'].between(phi[_j], phi[_j+1]) &
-                df['h'].between(h[_i], h[_i+1])]
+            subset = df[0].iloc[groups.get(_i*npts_phi + _j, [])]
 
             if len(subset)==0:
                 print("Encountered empty bin\n"
@@ -364,7 +382,7 @@ def _bin(df, handle, npts_phi=60, npts_h=30):
                       "h: %f, %f\n" %
                       (phi[_j], phi[_j+1], h[_i], h[_i+1]) )
 
-            binned[_i, _j] = handle(subset[0])
+            binned[_i, _j] = handle(subset)
 
     return DataArray(
         dims=('phi', 'h'),
@@ -374,6 +392,20 @@ def _bin(df, handle, npts_phi=60, npts_h=30):
 
 
 
+def _locate(values, edges):
+    """ Returns indices of the first and last cells containing each value
+
+    As with pandas.Series.between, cells are closed intervals, so a value on
+    the edge between two cells lies within both, and a value outside the
+    edges lies within none (first > last)
+    """
+    values = np.asarray(values)
+    first = np.searchsorted(edges, values, side='left') - 1
+    last = np.searchsorted(edges, values, side='right') - 1
+    return np.maximum(first, 0), np.minimum(last, len(edges)-2)
+
+
+
 #
 # utility functions
 #
@@ -7,10 +7,9 @@ import numpy as np
 import matplotlib.pyplot as pyplot
 
 from collections import defaultdict
-from matplotlib.font_manager import FontProperties
 from mtuq.dataset import Dataset
 from mtuq.event import MomentTensor, Force
-from mtuq.graphics.header import MomentTensorHeader, ForceHeader
+from mtuq.graphics.header import MomentTensorHeader, ForceHeader, _get_font
 from mtuq.util import warn
 from mtuq.util.signal import get_components
 from obspy import Stream, Trace
@@ -450,8 +449,7 @@ def _plot(axis, dat, syn, label=None):
 def _add_component_labels1(axes, body_wave_labels=True, surface_wave_labels=True):
     """ Displays component name above each column
     """
-    font = FontProperties()
-    font.set_weight('bold')
+    font = _get_font(weight='bold')
 
     ax = axes[0][1]
     pyplot.text(0.,0.70, 'Z', fontproperties=font, fontsize=16,
@@ -469,8 +467,7 @@ def _add_component_labels1(axes, body_wave_labels=True, surface_wave_labels=True
 def _add_component_labels2(axes, body_wave_labels=True, surface_wave_labels=True):
     """ Displays component name above each column
     """
-    font = FontProperties()
-    font.set_weight('bold')
+    font = _get_font(weight='bold')
 
     ax = axes[0][1]
     pyplot.text(0.,0.70, 'Z', fontproperties=font, fontsize=16,
@@ -579,21 +576,17 @@ def _time_stats(trace):
 
 
 def _count(datasets):
-    # counts number of nonempty streams in dataset(s)
-    count = 0
-    for streams in zip(*datasets):
-        for stream in streams:
-            if len(stream) > 0:
-                count += 1
-                break
-    return count
+    # counts number of stations with a nonempty stream in any dataset
+    return sum(any(len(stream) > 0 for stream in streams)
+        for streams in zip(*datasets))
 
 
 def _isempty(dataset):
+    # stops at the first nonempty stream, rather than counting all of them
     if not dataset:
         return True
     else:
-        return bool(_count([dataset])==0)
+        return not any(len(stream) > 0 for stream in dataset)
 
 
 def _max(dat, syn):
@@ -621,12 +614,7 @@ def _hide_axes(axes):
     # hides axes lines, ticks, and labels
     for row in axes:
         for col in row:
-            col.spines['top'].set_visible(False)
-            col.spines['right'].set_visible(False)
-            col.spines['bottom'].set_visible(False)
-            col.spines['left'].set_visible(False)
-            col.get_xaxis().set_ticks([])
-            col.get_yaxis().set_ticks([])
+            col.set_axis_off()
 
 
 def _prepare_synthetics(data, greens, misfit, source):
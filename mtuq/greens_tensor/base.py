@@ -191,12 +191,10 @@ class GreensTensor(Stream):
             synthetics = self._allocate_stream()
 
         for _i, component in enumerate(self.components):
-            # Even with careful attention to index order, np.dot is very slow.
-            # For some reason the following is faster
-            data = synthetics[_i].data
-            data[:] = 0.
-            for _j in range(len(source)):
-                data += source[_j]*array[_i, _j, :]
+            # writing the matrix-vector product directly into the trace data
+            # avoids both a Python-level loop over source elements and any
+            # temporary arrays
+            np.dot(source, array[_i], out=synthetics[_i].data)
         return synthetics
 
 
@@ -79,14 +79,18 @@ class Grid(object):
         self.ndim = len(shape)
         self.shape = tuple(shape)
 
+        # 64-bit product avoids overflow of the platform default integer
+        # type for large grids
+        npts = int(np.prod(shape, dtype=np.int64))
+
         # what part of the grid do we want to iterate over?
         self.start = start
         if stop:
             self.stop = stop
             self.size = stop-start
         else:
-            self.stop = np.product(shape)
-            self.size = np.product(shape)-start
+            self.stop = npts
+            self.size = npts-start
         self.index = start
 
         self.callback = callback
@@ -95,9 +99,14 @@ class Grid(object):
     def to_array(self):
         """ Returns the entire set of grid points as a NumPy array
         """
+        # converts flat indices to multidimensional indices all at once,
+        # rather than calling get for each grid point
+        indices = np.unravel_index(
+            np.arange(self.start, self.stop), self.shape)
+
         array = np.zeros((self.size, self.ndim))
-        for _i in range(self.size):
-            array[_i, :] = self.get(_i+self.start, callback=None)
+        for _k in range(self.ndim):
+            array[:, _k] = self.coords[_k][indices[_k]]
         return array
 
 
@@ -153,12 +162,15 @@ class Grid(object):
             callback = self.callback
 
         vals = self.coords
-        array = np.zeros(self.ndim)
+        shape = self.shape
+        array = np.empty(self.ndim)
 
+        # integer division avoids the loss of precision that floating point
+        # division would cause for very large grids
+        i = int(i)
         for _k in range(self.ndim-1, -1, -1):
-            val = vals[_k]
-            array[_k] = val[int(i%len(val))]
-            i/=len(val)
+            i, _j = divmod(i, shape[_k])
+            array[_k] = vals[_k][_j]
 
         if callback:
             return callback(*array)
@@ -295,9 +307,11 @@ class UnstructuredGrid(object):
     def to_array(self):
         """ Returns the entire set of grid points as a NumPy array
         """
+        # copies coordinates all at once, rather than calling get for each
+        # grid point
         array = np.zeros((self.size, self.ndim))
-        for _i in range(self.size):
-            array[_i, :] = self.get(_i+self.start, callback=None)
+        for _k in range(self.ndim):
+            array[:, _k] = self.coords[_k][:self.size]
         return array
 
 
@@ -108,10 +108,9 @@ def grid_search(data, greens, misfit, origins, sources,
         msg_interval=msg_interval)
 
     if _is_mpi_env() and gather:
-        values = comm.gather(values, root=0)
-        if iproc == 0:
-            values = np.concatenate(values, axis=0)
-        else:
+        from mtuq.util.mpi import gather_rows
+        values = gather_rows(comm, values, root=0)
+        if iproc != 0:
             return
 
     # convert from NumPy array to DataArray or DataFrame
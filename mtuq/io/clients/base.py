@@ -1,4 +1,5 @@
 
+from concurrent.futures import ThreadPoolExecutor
 from mtuq.greens_tensor import GreensTensorList
 from mtuq.util import iterable
 
@@ -12,6 +13,10 @@ class Client(object):
     subclass.
     """
 
+    # maximum number of Green's tensors read concurrently on separate threads,
+    # which helps only if reads are I/O-bound and the subclass is thread-safe
+    _max_workers = 1
+
     def __init__(self, path_or_url='', **kwargs):
         raise NotImplementedError("Must be implemented by subclass")
 
@@ -46,8 +51,16 @@ class Client(object):
                     print("  origin depth (km): %d" % int(origin.depth_in_m/1000.))
                     print("")
 
-            for _j, station in enumerate(stations):
-                tensors += [self._get_greens_tensor(station, origin)]
+            if self._max_workers > 1 and nj > 1:
+                # executor.map preserves the order of stations
+                with ThreadPoolExecutor(
+                    max_workers=min(self._max_workers, nj)) as executor:
+                    tensors += list(executor.map(
+                        lambda station: self._get_greens_tensor(station, origin),
+                        stations))
+            else:
+                for _j, station in enumerate(stations):
+                    tensors += [self._get_greens_tensor(station, origin)]
 
         return GreensTensorList(tensors)
 
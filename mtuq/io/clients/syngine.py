@@ -41,6 +41,9 @@ class Client(ClientBase):
 
     """
 
+    # downloads are I/O-bound, so several can be waited on at once
+    _max_workers = 4
+
     def __init__(self, path_or_url=None, model=None, 
                  include_mt=True, include_force=False):
 
@@ -106,6 +106,12 @@ class Misfit(object):
       tuning or compiler troubleshooting, users may wish to modify the
       `get_compier_args` function in `setup.py`.
 
+    .. note::
+
+      If compiled with OpenMP support, the ``level2`` C extension divides
+      sources among all available threads.  When running one MPI process per
+      core, consider setting ``OMP_NUM_THREADS=1`` to avoid oversubscription.
+
     """
 
     def __init__(self,
@@ -3,96 +3,195 @@
 #include <numpy/arrayobject.h>
 #include <numpy/npy_math.h>
 #include <math.h>
+#include <stdlib.h>
+
+#ifdef _OPENMP
+#include <omp.h>
+#endif
 
 
 //
 // array access macros
 //
+
+// All arrays are required to be C-contiguous, so elements can be located
+// from array dimensions alone; compared with looking up strides on every
+// access, this makes the innermost loops unit-stride and vectorizable
+
+#define data(i0,i1,i2)\
+    (data_ptr[((i0)*NC+(i1))*NT+(i2)])
+
+#define greens(i0,i1,i2,i3)\
+    (greens_ptr[(((i0)*NC+(i1))*NG+(i2))*NTPAD+(i3)])
+
 #define data_data(i0,i1)\
-    (*(npy_float64*)((PyArray_DATA(data_data)+\
-    (i0) * PyArray_STRIDES(data_data)[0]+\
-    (i1) * PyArray_STRIDES(data_data)[1])))
+    (data_data_ptr[(i0)*NC+(i1)])
 
 #define greens_data(i0,i1,i2,i3)\
-    (*(npy_float64*)((PyArray_DATA(greens_data)+\
-    (i0) * PyArray_STRIDES(greens_data)[0]+\
-    (i1) * PyArray_STRIDES(greens_data)[1]+\
-    (i2) * PyArray_STRIDES(greens_data)[2]+\
-    (i3) * PyArray_STRIDES(greens_data)[3])))
+    (greens_data_ptr[(((i0)*NC+(i1))*NG+(i2))*NPAD+(i3)])
+
+#define greens_data_grouped(i0,i1,i2,i3)\
+    (greens_data_grouped_ptr[(((i0)*NGRP+(i1))*NG+(i2))*NPAD+(i3)])
 
 #define greens_greens(i0,i1,i2,i3,i4)\
-    (*(npy_float64*)((PyArray_DATA(greens_greens)+\
-    (i0) * PyArray_STRIDES(greens_greens)[0]+\
-    (i1) * PyArray_STRIDES(greens_greens)[1]+\
-    (i2) * PyArray_STRIDES(greens_greens)[2]+\
-    (i3) * PyArray_STRIDES(greens_greens)[3]+\
-    (i4) * PyArray_STRIDES(greens_greens)[4])))
+    (greens_greens_ptr[((((i0)*NC+(i1))*NPAD+(i2))*NG+(i3))*NG+(i4)])
 
 #define sources(i0,i1)\
-    (*(npy_float64*)((PyArray_DATA(sources)+\
-    (i0) * PyArray_STRIDES(sources)[0]+\
-    (i1) * PyArray_STRIDES(sources)[1])))
+    (sources_ptr[(i0)*NG+(i1)])
 
 #define groups(i0,i1)\
-    (*(npy_float64*)((PyArray_DATA(groups)+\
-    (i0) * PyArray_STRIDES(groups)[0]+\
-    (i1) * PyArray_STRIDES(groups)[1])))
+    (groups_ptr[(i0)*NC+(i1)])
 
 #define weights(i0,i1)\
-    (*(npy_float64*)((PyArray_DATA(weights)+\
-    (i0) * PyArray_STRIDES(weights)[0]+\
-    (i1) * PyArray_STRIDES(weights)[1])))
+    (weights_ptr[(i0)*NC+(i1)])
 
 #define results(i0)\
-    (*(npy_float64*)((PyArray_DATA(results)+\
-    (i0) * PyArray_STRIDES(results)[0])))
+    (results_ptr[(i0)])
+
+#define cc(i0) (cc[(i0)])
 
-#define cc(i0)\
-    (*(npy_float64*)((PyArray_DATA(cc)+\
-    (i0) * PyArray_STRIDES(cc)[0])))
+#define syn(i0) (syn[(i0)])
 
 
 
 //
+// misfit evaluation
 //
-// L2 misfit function
+
+static inline npy_float64 add_s2_minus_2sd(npy_float64 L2_tmp,
+    const npy_float64 *gg, const npy_float64 *gd, npy_intp gd_stride,
+    const npy_float64 *s, const int ng) {
+  // Adds s^2 - 2sd for a single trace and time shift to L2_tmp, given
+  // greens_greens (ng x ng), greens_data (ng values spaced gd_stride apart)
+  // and source weights (ng)
+
+  // since greens_greens is symmetric, only the upper triangle is needed,
+  // that is, s^2 = sum_j1 2 s_j1 (s_j1 gg_j1j1/2 + sum_j2>j1 s_j2 gg_j1j2)
+  int j1, j2;
+  npy_float64 L2_row;
+
+  for (j1=0; j1<ng; j1++) {
+    L2_row = 0.5 * gg[j1*ng+j1] * s[j1] - gd[j1*gd_stride];
+
+    for (j2=j1+1; j2<ng; j2++) {
+      L2_row += gg[j1*ng+j2] * s[j2];
+    }
+    L2_tmp += 2. * s[j1] * L2_row;
+  }
+  return L2_tmp;
+}
+
+
+static inline npy_float64 sum_abs_s_minus_d(npy_float64 *syn,
+    const npy_float64 *g, npy_intp g_stride, const npy_float64 *d,
+    const npy_float64 *s, const int ng, const int nt) {
+  // Returns sum |s - d| for a single trace, given shifted Green's functions
+  // (ng time series of length nt spaced g_stride apart), data (nt) and
+  // source weights (ng); syn is a work array of length nt
+  int ig, it;
+  npy_float64 L1_tmp = 0.;
+
+  for (it=0; it<nt; it++) {
+    syn(it) = g[it] * s[0];
+  }
+  for (ig=1; ig<ng; ig++) {
+    for (it=0; it<nt; it++) {
+      syn(it) += g[ig*g_stride+it] * s[ig];
+    }
+  }
+  for (it=0; it<nt; it++) {
+    L1_tmp += fabs(syn(it) - d[it]);
+  }
+  return L1_tmp;
+}
+
+
+
 //
+// argument checking
 //
 
+static int check_array(PyArrayObject *array, const char *name, int ndim,
+    npy_intp *shape) {
+  // Checks that array is C-contiguous, double precision and of given shape
+  // (negative values in shape match any length)
+  int i;
+
+  if (!PyArray_IS_C_CONTIGUOUS(array) || PyArray_TYPE(array)!=NPY_DOUBLE) {
+    PyErr_Format(PyExc_ValueError,
+      "%s must be a C-contiguous float64 array", name);
+    return 0;
+  }
+  if (PyArray_NDIM(array)!=ndim) {
+    PyErr_Format(PyExc_ValueError,
+      "%s must have %d dimensions", name, ndim);
+    return 0;
+  }
+  for (i=0; i<ndim; i++) {
+    if (shape[i]>=0 && PyArray_SHAPE(array)[i]!=shape[i]) {
+      PyErr_Format(PyExc_ValueError,
+        "%s has inconsistent shape along axis %d", name, i);
+      return 0;
+    }
+  }
+  return 1;
+}
+
+
+
+//
+//
+// L2, hybrid and L1 misfit functions
+//
+//
+
+// values of the norm argument
+#define NORM_L2 0
+#define NORM_HYBRID 1
+#define NORM_L1 2
+
 static PyObject *misfit(PyObject *self, PyObject *args) {
 
+  // data and Green's function input arrays (used only for the L1 norm,
+  // which cannot be evaluated from cross-correlations alone)
+  PyArrayObject *data, *greens;
+
    // cross-correlation input arrays
-  PyArrayObject *data_data, *greens_data, *greens_greens;
+  PyArrayObject *data_data, *greens_data, *greens_data_grouped, *greens_greens;
 
   // other input arrays
   PyArrayObject *sources, *groups, *weights;
 
   // scalar input arguments
-  int hybrid_norm;
+  int norm;
   npy_float64 dt;
   int NPAD1, NPAD2;
   int debug_level;
   int msg_start, msg_stop, msg_percent;
 
   int NSRC, NSTA, NC, NG, NGRP;
-  int isrc, ista, ic, ig, igrp;
-
-  int cc_argmax, it, itpad, j1, j2, nd, NPAD;
-  npy_float64 cc_max, L2_sum, L2_tmp;
+  int nd, NPAD, NT, NTPAD;
 
+  int nthreads;
   float iter, next_iter;
   int msg_count, msg_interval;
+  int out_of_memory;
+  int ista, ic, igrp;
+  int *active, *nactive;
 
 
   // parse arguments
-  if (!PyArg_ParseTuple(args, "O!O!O!O!O!O!idiiiiii",
+  if (!PyArg_ParseTuple(args, "O!O!O!O!O!O!O!O!O!idiiiiii",
+                        &PyArray_Type, &data,
+                        &PyArray_Type, &greens,
                         &PyArray_Type, &data_data,
                         &PyArray_Type, &greens_data,
+                        &PyArray_Type, &greens_data_grouped,
                         &PyArray_Type, &greens_greens,
                         &PyArray_Type, &sources,
                         &PyArray_Type, &groups,
                         &PyArray_Type, &weights,
-                        &hybrid_norm,
+                        &norm,
                         &dt,
                         &NPAD1,
                         &NPAD2,
@@ -104,6 +203,18 @@ static PyObject *misfit(PyObject *self, PyObject *args) {
   }
 
 
+  {
+    npy_intp shape_sources[] = {-1, -1};
+    npy_intp shape_weights[] = {-1, -1};
+    npy_intp shape_groups[] = {-1, -1};
+
+    if (!check_array(sources, "sources", 2, shape_sources) ||
+        !check_array(weights, "weights", 2, shape_weights) ||
+        !check_array(groups, "groups", 2, shape_groups)) {
+      return NULL;
+    }
+  }
+
   NSRC = (int) PyArray_SHAPE(sources)[0];
   NSTA = (int) PyArray_SHAPE(weights)[0];
   NC = (int) PyArray_SHAPE(weights)[1];
@@ -112,6 +223,53 @@ static PyObject *misfit(PyObject *self, PyObject *args) {
 
   NPAD = (int) NPAD1+NPAD2+1;
 
+  if (norm!=NORM_L2 && norm!=NORM_HYBRID && norm!=NORM_L1) {
+    PyErr_Format(PyExc_ValueError, "Bad norm: %d", norm);
+    return NULL;
+  }
+
+  {
+    npy_intp shape_data[] = {NSTA, NC, -1};
+
+    if (!check_array(data, "data", 3, shape_data)) {
+      return NULL;
+    }
+  }
+
+  NT = (int) PyArray_SHAPE(data)[2];
+  NTPAD = NT+NPAD-1;
+
+  {
+    npy_intp shape_greens[] = {NSTA, NC, NG, NTPAD};
+    npy_intp shape_data_data[] = {NSTA, NC};
+    npy_intp shape_greens_data[] = {NSTA, NC, NG, NPAD};
+    npy_intp shape_greens_data_grouped[] = {NSTA, NGRP, NG, NPAD};
+    npy_intp shape_greens_greens[] = {NSTA, NC, NPAD, NG, NG};
+    npy_intp shape_groups[] = {NGRP, NC};
+
+    if (!check_array(greens, "greens", 4, shape_greens) ||
+        !check_array(data_data, "data_data", 2, shape_data_data) ||
+        !check_array(greens_data, "greens_data", 4, shape_greens_data) ||
+        !check_array(greens_data_grouped, "greens_data_grouped", 4,
+            shape_greens_data_grouped) ||
+        !check_array(greens_greens, "greens_greens", 5, shape_greens_greens) ||
+        !check_array(groups, "groups", 2, shape_groups)) {
+      return NULL;
+    }
+  }
+
+  const npy_float64 *data_ptr = (npy_float64*) PyArray_DATA(data);
+  const npy_float64 *greens_ptr = (npy_float64*) PyArray_DATA(greens);
+  const npy_float64 *data_data_ptr = (npy_float64*) PyArray_DATA(data_data);
+  const npy_float64 *greens_data_ptr = (npy_float64*) PyArray_DATA(greens_data);
+  const npy_float64 *greens_data_grouped_ptr =
+      (npy_float64*) PyArray_DATA(greens_data_grouped);
+  const npy_float64 *greens_greens_ptr =
+      (npy_float64*) PyArray_DATA(greens_greens);
+  const npy_float64 *sources_ptr = (npy_float64*) PyArray_DATA(sources);
+  const npy_float64 *groups_ptr = (npy_float64*) PyArray_DATA(groups);
+  const npy_float64 *weights_ptr = (npy_float64*) PyArray_DATA(weights);
+
   if (debug_level>1) {
     printf(" number of sources:  %d\n", NSRC);
     printf(" number of stations:  %d\n", NSTA);
@@ -122,13 +280,55 @@ static PyObject *misfit(PyObject *self, PyObject *args) {
 
 
   // allocate arrays
-  nd = 1;
-  npy_intp dims_cc[] = {(int)NPAD};
-  PyObject *cc = PyArray_SimpleNew(nd, dims_cc, NPY_DOUBLE);
-
   nd = 2;
   npy_intp dims_results[] = {(int)NSRC, 1};
   PyObject *results = PyArray_SimpleNew(nd, dims_results, NPY_DOUBLE);
+  if (results==NULL) {
+    return NULL;
+  }
+  npy_float64 *results_ptr = (npy_float64*) PyArray_DATA((PyArrayObject*) results);
+
+  // Which traces contribute to the misfit depends only on groups and
+  // weights, not on the source, so the components to be evaluated for each
+  // station and component group are listed once here rather than tested
+  // inside the source loop
+  active = (int*) malloc(NSTA*NGRP*NC*sizeof(int));
+  nactive = (int*) malloc(NSTA*NGRP*sizeof(int));
+  if (active==NULL || nactive==NULL) {
+    free(active);
+    free(nactive);
+    Py_DECREF(results);
+    return PyErr_NoMemory();
+  }
+
+  for (ista=0; ista<NSTA; ista++) {
+    for (igrp=0; igrp<NGRP; igrp++) {
+      nactive[ista*NGRP+igrp] = 0;
+      for (ic=0; ic<NC; ic++) {
+
+        // Skip components not in the component group being considered
+        if (((int) groups(igrp,ic))==0) {
+          continue;
+        }
+
+        // Skip traces that have been assigned zero weight
+        if (((int) weights(ista,ic))==0) {
+          if (debug_level>1) {
+            printf(" skipping trace: %d %d\n", ista, ic);
+          }
+          continue;
+        }
+
+        active[(ista*NGRP+igrp)*NC + nactive[ista*NGRP+igrp]] = ic;
+        nactive[ista*NGRP+igrp] += 1;
+      }
+    }
+  }
+
+  nthreads = 1;
+#ifdef _OPENMP
+  nthreads = omp_get_max_threads();
+#endif
 
 
   // initialize progress messages
@@ -148,16 +348,59 @@ static PyObject *misfit(PyObject *self, PyObject *args) {
   // Iterate over sources
   //
 
+  // Sources are independent of one another, so if OpenMP is available they
+  // are divided among threads; each thread has its own cross-correlation
+  // buffer (and, for the L1 norm, synthetics buffer)
+
+  // No Python objects are touched below, so other Python threads may run
+  // while misfit values are being computed
+  out_of_memory = 0;
+  Py_BEGIN_ALLOW_THREADS
+
+  #pragma omp parallel
+  {
+
+  int isrc, ista, ic, ig, igrp, k;
+  int cc_argmax, it, itpad;
+  npy_float64 cc_max, L2_sum, L2_tmp;
+
+  npy_float64 *cc = (npy_float64*) malloc(NPAD*sizeof(npy_float64));
+  npy_float64 *syn = NULL;
+  if (norm==NORM_L1) {
+    syn = (npy_float64*) malloc(NT*sizeof(npy_float64));
+  }
+  const int no_buffer = (cc==NULL || (norm==NORM_L1 && NT>0 && syn==NULL));
+
+  int master = 1;
+#ifdef _OPENMP
+  master = (omp_get_thread_num()==0);
+#endif
+
+  // cannot return from inside a parallel region, so threads without a
+  // buffer skip their share of the work and an error is raised afterwards
+  if (no_buffer) {
+    #pragma omp atomic write
+    out_of_memory = 1;
+  }
+
+  #pragma omp for schedule(static)
   for(isrc=0; isrc<NSRC; ++isrc) {
 
+    if (no_buffer) {
+      continue;
+    }
 
     // display progress message
-    if (iter >= next_iter) {
-        printf("  about %d percent finished\n", msg_percent*msg_count);
-        msg_count += 1;
-        next_iter = msg_count*msg_interval;
+    // (with static scheduling, progress of the master thread is
+    // representative of overall progress)
+    if (master) {
+      if (iter >= next_iter) {
+          printf("  about %d percent finished\n", msg_percent*msg_count);
+          msg_count += 1;
+          next_iter = msg_count*msg_interval;
+      }
+      iter += nthreads;
     }
-    iter += 1;
 
 
     L2_sum = (npy_float64) 0.;
@@ -165,6 +408,13 @@ static PyObject *misfit(PyObject *self, PyObject *args) {
     for (ista=0; ista<NSTA; ista++) {
       for (igrp=0; igrp<NGRP; igrp++) {
 
+        const int *active_ic = &active[(ista*NGRP+igrp)*NC];
+        const int nactive_ic = nactive[ista*NGRP+igrp];
+
+        if (nactive_ic==0) {
+          continue;
+        }
+
         /*
 
         Finds the shift between data and synthetics that yields the maximum
@@ -173,43 +423,46 @@ static PyObject *misfit(PyObject *self, PyObject *args) {
 
         */
 
-        for (it=0; it<NPAD; it++) {
-          cc(it) = (npy_float64) 0.;
+        // Without time shifts (time_shift_min==time_shift_max==0) there is
+        // only one admissible shift, so cross-correlations are not needed
+        if (NPAD==1) {
+          itpad = 0;
         }
-
-        for (ic=0; ic<NC; ic++) {
-
-          // Skip components not in the component group being considered
-          if (((int) groups(igrp,ic))==0) {
-            continue;
-           }
-
-          // Skip traces that have been assigned zero weight
-          if (((int) weights(ista,ic))==0) {
-              if (debug_level>1) {
-                if (isrc==0) {
-                  printf(" skipping trace: %d %d\n", ista, ic);
-                }
-              }
-              continue;
-           }
-
-          // Sum cross-correlations of all components being considered
-          for (ig=0; ig<NG; ig++) {
+        else {
+          // Cross-correlations of all components in the group, excluding
+          // traces that have been assigned zero weight, were summed ahead of
+          // time, so there is only one cross-correlation to evaluate; the
+          // first source coefficient initializes cc, so no zero fill is needed
+          {
+            const npy_float64 *row = &greens_data_grouped(ista,igrp,0,0);
+            const npy_float64 coef = sources(isrc,0);
             for (it=0; it<NPAD; it++) {
-                cc(it) += greens_data(ista,ic,ig,it) * sources(isrc,ig);
+                cc(it) = row[it] * coef;
             }
           }
-        }
-        cc_max = -NPY_INFINITY;
-        cc_argmax = 0;
-        for (it=0; it<NPAD; it++) {
-          if (cc(it) > cc_max) {
-            cc_max = cc(it);
-            cc_argmax= it;
+          for (ig=1; ig<NG; ig++) {
+            const npy_float64 *row = &greens_data_grouped(ista,igrp,ig,0);
+            const npy_float64 coef = sources(isrc,ig);
+            for (it=0; it<NPAD; it++) {
+                cc(it) += row[it] * coef;
+            }
           }
+          // Finds the maximum in two passes: the first has no data-dependent
+          // branches and so can be vectorized, the second stops at the first
+          // sample attaining the maximum
+          cc_max = -NPY_INFINITY;
+          for (it=0; it<NPAD; it++) {
+            cc_max = (cc(it) > cc_max) ? cc(it) : cc_max;
+          }
+          cc_argmax = 0;
+          for (it=0; it<NPAD; it++) {
+            if (cc(it)==cc_max) {
+              cc_argmax = it;
+              break;
+            }
+          }
+          itpad = cc_argmax;
         }
-        itpad = cc_argmax;
 
 
         /*
@@ -223,42 +476,48 @@ static PyObject *misfit(PyObject *self, PyObject *args) {
         ||s - d||^2 = s^2 + d^2 - 2sd
 
         */
-        for (ic=0; ic<NC; ic++) {
-          L2_tmp = 0.;
-
-          // Skip components not in the component group being considered
-          if (((int) groups(igrp,ic))==0) {
+        for (k=0; k<nactive_ic; k++) {
+          ic = active_ic[k];
+
+          if (norm==NORM_L1) {
+            // L1 norm, evaluated from shifted synthetics
+            L2_sum += dt * weights(ista,ic) * sum_abs_s_minus_d(syn,
+              &greens(ista,ic,0,itpad), NTPAD, &data(ista,ic,0),
+              &sources(isrc,0), NG, NT);
             continue;
-          } 
-
-          // Skip traces that have been assigned zero weight
-          if (((int) weights(ista,ic))==0) {
-              continue;
           }
 
-          // calculate s^2
-          for (j1=0; j1<NG; j1++) {
-            for (j2=0; j2<NG; j2++) {
-              L2_tmp += sources(isrc, j1) * sources(isrc, j2) *
-                  greens_greens(ista,ic,itpad,j1,j2);
-            }
-          }
+          L2_tmp = 0.;
 
           // calculate d^2
           L2_tmp += data_data(ista,ic);
 
-          // calculate sd
-          for (ig=0; ig<NG; ig++) {
-            L2_tmp -= 2.*greens_data(ista,ic,ig,itpad) * sources(isrc, ig); 
+          // calculate s^2 - 2sd in a single pass; NG is 6 for moment
+          // tensors and 3 for forces, and passing these as constants lets
+          // the compiler fully unroll the loops over Green's functions
+          {
+            const npy_float64 *gg = &greens_greens(ista,ic,itpad,0,0);
+            const npy_float64 *gd = &greens_data(ista,ic,0,itpad);
+            const npy_float64 *s = &sources(isrc,0);
+
+            if (NG==6) {
+              L2_tmp = add_s2_minus_2sd(L2_tmp, gg, gd, NPAD, s, 6);
+            }
+            else if (NG==3) {
+              L2_tmp = add_s2_minus_2sd(L2_tmp, gg, gd, NPAD, s, 3);
+            }
+            else {
+              L2_tmp = add_s2_minus_2sd(L2_tmp, gg, gd, NPAD, s, NG);
+            }
           }
 
-          if (hybrid_norm==0) {
+          if (norm==NORM_L2) {
               // L2 norm
               L2_sum += dt * weights(ista,ic) * L2_tmp;
           }
           else {
               // hybrid L1-L2 norm
-              L2_sum += dt * weights(ista,ic) * pow(L2_tmp, 0.5);
+              L2_sum += dt * weights(ista,ic) * sqrt(L2_tmp);
           }
         }
 
@@ -267,6 +526,22 @@ static PyObject *misfit(PyObject *self, PyObject *args) {
     results(isrc) = L2_sum;
 
   }
+
+  free(cc);
+  free(syn);
+
+  }
+
+  Py_END_ALLOW_THREADS
+
+  free(active);
+  free(nactive);
+
+  if (out_of_memory) {
+    Py_DECREF(results);
+    return PyErr_NoMemory();
+  }
+
   return results;
 
 }
@@ -28,6 +28,24 @@ def misfit(data, greens, sources, norm, time_shift_groups,
         helpers += [Helper(data[_j], greens[_j], norm, 
                            time_shift_min, time_shift_max)]
 
+    #
+    # precompute quantities that do not depend on source
+    #
+    sampling = []
+    indices = []
+    weights = []
+    for _j, d in enumerate(data):
+        components = greens[_j].components
+
+        # time sampling scheme
+        sampling += [get_time_sampling(d)]
+
+        # which components belong to which time shift group?
+        indices += [[list_intersect_with_indices(components, group)[1]
+            for group in time_shift_groups]]
+
+        weights += [[getattr(trace, 'weight', 1.) for trace in d]]
+
     #
     # iterate over sources
     #
@@ -45,22 +63,15 @@ def misfit(data, greens, sources, norm, time_shift_groups,
             if not components:
                 continue
 
-            # time sampling scheme
-            npts, dt = get_time_sampling(d)
-            padding_left = int(+time_shift_max/dt)
-            padding_right = int(-time_shift_min/dt)
-
+            npts, dt = sampling[_j]
 
-            for group in time_shift_groups:
+            for group_indices in indices[_j]:
                 # Finds the time-shift between data and synthetics that yields
                 # the maximum cross-correlation value across all components in 
                 # a given group, subject to min/max constraints
-                _, indices = list_intersect_with_indices(
-                    components, group)
-
-                ic = helpers[_j].get_time_shift(source, indices)
+                ic = helpers[_j].get_time_shift(source, group_indices)
 
-                for _k in indices:
+                for _k in group_indices:
                     value = 0.
 
                     if norm=='L1':
@@ -78,10 +89,7 @@ def misfit(data, greens, sources, norm, time_shift_groups,
                         value = dt * helpers[_j].get_L2_norm(
                             source, _k, ic)**0.5
 
-                    try:
-                        values[_i] += d[_k].weight * value
-                    except:
-                        values[_i] += value
+                    values[_i] += weights[_j][_k] * value
 
     return values
 
@@ -106,7 +114,6 @@ class Helper(object):
         misfit += self.d_d[index]
 
         # s^2 contribution
-        _  = np.dot(self.g_g[index, it, :, :], source)
         misfit += np.dot(np.dot(self.g_g[index, it, :, :], source), source)
 
         # -2sd contribution
@@ -159,15 +166,13 @@ class Helper(object):
         Finds optimal time shift between the given data and synthetics
         generated from the given source
         """
-        cc = self.g_d
-
-        cc_sum = self.cc_sum
-        cc_sum[:] = 0.
-
-        for _i in indices:
-            cc_sum += np.dot(source, cc[_i, :, :])
+        # cross-correlations summed over the given components do not depend
+        # on source, so they are computed once and reused
+        key = tuple(indices)
+        if key not in self.g_d_sum:
+            self.g_d_sum[key] = self.g_d[list(indices), :, :].sum(axis=0)
 
-        return cc_sum.argmax()
+        return np.dot(source, self.g_d_sum[key]).argmax()
 
 
     def __init__(self, d, g, norm, time_shift_min, time_shift_max, debug=False):
@@ -195,7 +200,7 @@ class Helper(object):
         ngreens = greens.shape[1]
 
         self.source = None
-        self.cc_sum = np.zeros(npts_padding+1)
+        self.g_d_sum = {}
 
 
         #
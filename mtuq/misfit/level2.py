@@ -7,10 +7,10 @@ See ``mtuq/misfit/__init__.py`` for more information
 import numpy as np
 import time
 from copy import deepcopy
-from mtuq.misfit.level1 import correlate
 from mtuq.util.math import to_mij, to_rtp
 from mtuq.util.signal import get_components, get_time_sampling
 from mtuq.misfit import c_ext_L2
+from scipy.signal import fftconvolve
 
 
 def misfit(data, greens, sources, norm, time_shift_groups,
@@ -27,9 +27,13 @@ def misfit(data, greens, sources, norm, time_shift_groups,
     stations = _get_stations(data)
     components = _get_components(data)
 
+    # traces of each nonempty stream, keyed by component; looked up once here
+    # rather than repeatedly selected from the dataset
+    traces = _get_traces(data)
+
 
     # which components are absent from the data (boolean array)?
-    mask = _get_mask(data, stations, components)
+    mask = _get_mask(traces, components)
 
     # which components will be used to determine time shifts (boolean array)?
     groups = _get_groups(time_shift_groups, components)
@@ -38,7 +42,7 @@ def misfit(data, greens, sources, norm, time_shift_groups,
     #
     # collapse main structures into NumPy arrays
     #
-    data = _get_data(data, stations, components)
+    data = _get_data(data, traces, components)
     greens = _get_greens(greens, stations, components)
     sources = _to_array(sources)
 
@@ -53,11 +57,15 @@ def misfit(data, greens, sources, norm, time_shift_groups,
     data_data = _autocorr_1(data)
     greens_greens = _autocorr_2(greens, padding)
     greens_data = _corr_1_2(data, greens, padding)
+    greens_data_grouped = _sum_groups(greens_data, groups, mask)
 
-    if norm=='hybrid':
-        hybrid_norm = 1
-    else:
-        hybrid_norm = 0
+    # norm codes understood by the C extension
+    if norm=='L2':
+        norm_code = 0
+    elif norm=='hybrid':
+        norm_code = 1
+    elif norm=='L1':
+        norm_code = 2
 
     #
     # collect message attributes
@@ -74,13 +82,11 @@ def misfit(data, greens, sources, norm, time_shift_groups,
 
     start_time = time.time()
 
-    if norm in ['L2', 'hybrid']:
-        results = c_ext_L2.misfit(
-           data_data, greens_data, greens_greens, sources, groups, mask,
-           hybrid_norm, dt, padding[0], padding[1], debug_level, *msg_args)
-
-    elif norm in ['L1']:
-        raise NotImplementedError
+    results = c_ext_L2.misfit(
+       data, greens,
+       data_data, greens_data, greens_data_grouped, greens_greens,
+       sources, groups, mask,
+       norm_code, dt, padding[0], padding[1], debug_level, *msg_args)
 
     if debug_level > 0:
       print('  Elapsed time (C extension) (s): %f' % \
@@ -124,7 +130,8 @@ def _get_greens(greens, stations, components):
         ))
 
     for _i, station in enumerate(stations):
-        tensor = greens.select(station)[0]
+        # first matching tensor, without constructing a new GreensTensorList
+        tensor = next(tensor for tensor in greens if tensor.station==station)
 
         # fill in array
         tensor._set_components(components)
@@ -133,7 +140,7 @@ def _get_greens(greens, stations, components):
     return array
 
 
-def _get_data(data, stations, components):
+def _get_data(data, traces, components):
     # Collects numeric trace data from all streams as a single NumPy array;
     # compared with iterating over streams and traces, provides a potentially
     # faster way of accessing numeric trace data
@@ -145,22 +152,33 @@ def _get_data(data, stations, components):
 
     nt, dt = _get_time_sampling(data)
 
-    ns = len(stations)
+    ns = len(traces)
     nc = len(components)
     array = np.zeros((ns, nc, nt))
 
-    for _i, station in enumerate(stations):
-        stream = data.select(station)[0]
+    for _i, stream_traces in enumerate(traces):
         for _j, component in enumerate(components):
-            try:
-                trace = stream.select(component=component)[0]
-            except:
-                continue
-            array[_i, _j, :] = trace.data
+            if component in stream_traces:
+                array[_i, _j, :] = stream_traces[component].data
 
     return array
 
 
+def _get_traces(data):
+    # For each nonempty stream, in the same order as _get_stations, returns a
+    # dictionary of traces keyed by component (if a component occurs more
+    # than once, the first trace is used, consistent with stream.select)
+    traces = []
+    for stream in data:
+        if len(stream)==0:
+            continue
+        stream_traces = {}
+        for trace, component in zip(stream, get_components(stream)):
+            stream_traces.setdefault(component, trace)
+        traces += [stream_traces]
+    return traces
+
+
 
 def _get_components(data):
     components = list()
@@ -179,22 +197,18 @@ def _get_components(data):
     return components_sorted
 
 
-def _get_mask(data, stations, components):
+def _get_mask(traces, components):
     Ncomponents = len(components)
-    Nstations = len(stations)
+    Nstations = len(traces)
 
     mask = np.ones((
         Nstations,
         Ncomponents, 
         ))
 
-    for _i, station in enumerate(stations):
+    for _i, stream_traces in enumerate(traces):
         for _j, component in enumerate(components):
-
-            stream = data.select(station)[0]
-            stream = stream.select(component=component)
-
-            if len(stream)==0:
+            if component not in stream_traces:
                 mask[_i, _j] = 0.
 
     return mask
@@ -299,24 +313,42 @@ def _corr_1_2(data, greens, padding):
     Ncomponents = greens.shape[1]
     Nstations = greens.shape[0]
     Ngreens = greens.shape[2]
+    Npts = greens.shape[3]
+    Npad = padding[0]+padding[1]
+
+    if Npts>2000 or Npad>200:
+        # for long traces or large time shifts, frequency-domain 
+        # implementation is usually faster; vectorizing over stations,
+        # components and Green's functions means each trace is Fourier
+        # transformed only once
+        corr = fftconvolve(greens, data[:, :, None, ::-1], 'valid', axes=-1)
+        return np.ascontiguousarray(corr[:, :, :, :Npad+1])
 
     corr = np.zeros((
         Nstations,
         Ncomponents,
         Ngreens,
-        padding[0]+padding[1]+1,
+        Npad+1,
         ))
 
     for _i in range(Nstations):
         for _j in range(Ncomponents):
             for _k in range(Ngreens):
 
-                corr[_i, _j, _k, :] = correlate(
-                    greens[_i, _j, _k, :], data[_i, _j, :])
+                corr[_i, _j, _k, :] = np.correlate(
+                    greens[_i, _j, _k, :], data[_i, _j, :], 'valid')
 
     return corr
 
 
+def _sum_groups(greens_data, groups, mask):
+    # sums cross-correlations over the components in each time shift group,
+    # skipping missing components, so that time shifts can be determined
+    # from a single cross-correlation per group rather than one per component
+    return np.ascontiguousarray(np.einsum(
+        'gc,sc,scjt->sgjt', groups, mask, greens_data))
+
+
 def _autocorr_1(data):
     # autocorrelates 1D data strucutres (reduces to dot product)
     Ncomponents = data.shape[1]
@@ -343,9 +375,6 @@ def _autocorr_2(greens, padding):
     Ngreens = greens.shape[2]
     Npts = greens.shape[3]
 
-    ones = np.pad(np.ones(Npts), 
-        (padding[0], padding[1]), 'constant')
-
     corr = np.zeros((
         Nstations,
         Ncomponents, 
@@ -354,19 +383,35 @@ def _autocorr_2(greens, padding):
         Ngreens,
         ))
 
-    for _i in range(Nstations):
-        for _j in range(Ncomponents):
-            for _k1 in range(Ngreens):
-                for _k2 in range(Ngreens):
+    # Correlating products of Green's functions with a padded window of ones
+    # reduces to summing each product over a sliding window, which we 
+    # evaluate as the full sum minus short partial sums at either end
+    # (cheaper and more accurate than a full correlation)
+    k = np.arange(padding[0]+padding[1]+1)
+    start = np.clip(k-padding[1], 0, Npts)
+    stop = np.clip(Npts+k-padding[1], 0, Npts)
+
+    # calculate upper elements
+    k1, k2 = np.triu_indices(Ngreens)
+    products = greens[:, :, k1, :]*greens[:, :, k2, :]
 
-                    if _k1<=_k2:
-                        corr[_i, _j, :, _k1, _k2] = correlate(
-                            greens[_i, _j, _k1, :]*greens[_i, _j, _k2, :],
-                            ones)
+    head = _cumsum(products[..., :padding[0]])
+    tail = _cumsum(products[..., ::-1][..., :padding[1]])
 
-                    else:
-                        corr[_i, _j, :, _k1, _k2] = corr[_i, _j, :, _k2, _k1]
+    upper = products.sum(axis=-1)[..., None] -\
+        head[..., start] - tail[..., Npts-stop]
+
+    corr[:, :, :, k1, k2] = np.moveaxis(upper, 2, 3)
+
+    # fill in lower elements by symmetry
+    corr[:, :, :, k2, k1] = corr[:, :, :, k1, k2]
 
     return corr
 
 
+def _cumsum(array):
+    # cumulative sum along last axis, with leading zero
+    shape = array.shape[:-1] + (1,)
+    return np.concatenate((np.zeros(shape), np.cumsum(array, axis=-1)), 
+        axis=-1)
+
@@ -5,6 +5,7 @@ import numpy as np
 import warnings
 
 from copy import deepcopy
+from functools import lru_cache
 from obspy import taup
 from obspy.geodetics import gps2dist_azimuth
 from os.path import basename, exists
@@ -270,7 +271,7 @@ class ProcessData(object):
 
         elif self.pick_type == 'taup':
             assert self.taup_model is not None
-            self._taup = taup.TauPyModel(self.taup_model)
+            self._taup = _get_taup_model(self.taup_model)
 
         elif self.pick_type == 'FK_metadata':
             assert self.FK_database is not None
@@ -466,14 +467,13 @@ class ProcessData(object):
             picks = dict()
 
             if self.pick_type=='taup':
-                with warnings.catch_warnings():
-                    # supress obspy warning that gets raised even when taup is 
-                    # used correctly (someone should submit an obspy fix)
-                    warnings.filterwarnings('ignore')
-                    arrivals = self._taup.get_travel_times(
-                        origin.depth_in_m/1000., 
-                        m_to_deg(distance_in_m), 
-                        phase_list=['p', 's', 'P', 'S'])
+                # the same travel times are usually needed for data and
+                # Green's functions and for each window type, so they are
+                # cached rather than recalculated for each call
+                arrivals = _get_travel_times(
+                    self.taup_model,
+                    origin.depth_in_m/1000., 
+                    m_to_deg(distance_in_m))
                 try:
                     picks['P'] = get_arrival(arrivals, 'p')
                 except:
@@ -596,3 +596,25 @@ class ProcessData(object):
 
         return traces
 
+
+
+#
+# utility functions
+#
+
+@lru_cache(maxsize=None)
+def _get_taup_model(taup_model):
+    return taup.TauPyModel(taup_model)
+
+
+@lru_cache(maxsize=4096)
+def _get_travel_times(taup_model, depth_in_km, distance_in_deg):
+    with warnings.catch_warnings():
+        # supress obspy warning that gets raised even when taup is 
+        # used correctly (someone should submit an obspy fix)
+        warnings.filterwarnings('ignore')
+        return _get_taup_model(taup_model).get_travel_times(
+            depth_in_km,
+            distance_in_deg,
+            phase_list=['p', 's', 'P', 'S'])
+
@@ -5,6 +5,9 @@ from retry import retry
 
 import copy
 import csv
+import os
+import shutil
+import tempfile
 import time
 import numpy as np
 import obspy
@@ -14,6 +17,11 @@ import warnings
 import zipfile
 
 
+# the umask can only be read by setting it, so it is read once on import
+_umask = os.umask(0)
+os.umask(_umask)
+
+
 try:
     from urllib import URLopener
 except ImportError:
@@ -133,13 +141,44 @@ def unzip(filename):
         dirname = filename
         filename += '.zip'
 
-    zip_ref = zipfile.ZipFile(filename, 'r')
-    zip_ref.extractall(dirname)
-    zip_ref.close()
+    with zipfile.ZipFile(filename, 'r') as zip_ref:
+        if os.path.isdir(dirname):
+            if not _is_extracted(zip_ref, dirname):
+                # left incomplete by an interrupted extraction
+                zip_ref.extractall(dirname)
+            return dirname
+
+        # extracts to a temporary directory and then renames it, so that other
+        # threads never see a partially extracted directory
+        tmpdir = tempfile.mkdtemp(dir=os.path.dirname(abspath(dirname)))
+        try:
+            os.chmod(tmpdir, 0o777 & ~_umask)
+            zip_ref.extractall(tmpdir)
+            try:
+                os.rename(tmpdir, dirname)
+            except OSError:
+                # another thread finished extracting first
+                if not os.path.isdir(dirname):
+                    raise
+        finally:
+            if os.path.isdir(tmpdir):
+                shutil.rmtree(tmpdir)
 
     return dirname
 
 
+def _is_extracted(zip_ref, dirname):
+    for info in zip_ref.infolist():
+        path = join(dirname, info.filename)
+        if info.filename.endswith('/'):
+            if not os.path.isdir(path):
+                return False
+        elif not os.path.isfile(path) or\
+            os.path.getsize(path)!=info.file_size:
+            return False
+    return True
+
+
 def warn(*args, **kwargs):
     if is_mpi_env():
         from mpi4py import MPI
@@ -151,8 +190,18 @@ def warn(*args, **kwargs):
 
 @retry(Exception, tries=4, delay=2, backoff=2)
 def urlopen_with_retry(url, filename):
-    opener = URLopener()
-    opener.retrieve(url, filename)
+    # downloads to a temporary file and then renames it, so that other
+    # threads never see a partially written file
+    fd, tmpname = tempfile.mkstemp(dir=os.path.dirname(abspath(filename)))
+    os.close(fd)
+    try:
+        os.chmod(tmpname, 0o666 & ~_umask)
+        opener = URLopener()
+        opener.retrieve(url, tmpname)
+        os.replace(tmpname, filename)
+    finally:
+        if os.path.exists(tmpname):
+            os.remove(tmpname)
 
 
 def url2uuid(url):
@@ -29,18 +29,25 @@ class WeightParser(object):
     """
     def __init__(self, path):
         self._path = path
+        self._rows = None
+
+    def _read(self):
+        # reads the file only once, no matter how many parse_* methods are
+        # called
+        if self._rows is None:
+            with open(self._path) as file:
+                reader = csv.reader(
+                    filter(lambda row: row[0]!='#', file),
+                    delimiter=' ',
+                    skipinitialspace=True)
+                self._rows = list(reader)
+        return self._rows
 
     def parse_codes(self):
         codes = []
 
-        with open(self._path) as file:
-            reader = csv.reader(
-                filter(lambda row: row[0]!='#', file),
-                delimiter=' ',
-                skipinitialspace=True)
-
-            for row in reader:
-                codes += [self._parse_code(row[0])]
+        for row in self._read():
+            codes += [self._parse_code(row[0])]
 
         return codes
 
@@ -51,20 +58,14 @@ class WeightParser(object):
     def parse_weights(self):
         weights = defaultdict(AttribDict)
           
-        with open(self._path) as file:
-            reader = csv.reader(
-                filter(lambda row: row[0]!='#', file),
-                delimiter=' ',
-                skipinitialspace=True)
-
-            for row in reader:
-                _code = self._parse_code(row[0])
+        for row in self._read():
+            _code = self._parse_code(row[0])
 
-                weights[_code]['body_wave_Z'] = float(row[2])
-                weights[_code]['body_wave_R'] = float(row[3])
-                weights[_code]['surface_wave_Z'] = float(row[4])
-                weights[_code]['surface_wave_R'] = float(row[5])
-                weights[_code]['surface_wave_T'] = float(row[6])
+            weights[_code]['body_wave_Z'] = float(row[2])
+            weights[_code]['body_wave_R'] = float(row[3])
+            weights[_code]['surface_wave_Z'] = float(row[4])
+            weights[_code]['surface_wave_R'] = float(row[5])
+            weights[_code]['surface_wave_T'] = float(row[6])
 
         return weights
 
@@ -72,17 +73,11 @@ class WeightParser(object):
     def parse_picks(self):
         picks = defaultdict(AttribDict)
 
-        with open(self._path) as file:
-            reader = csv.reader(
-                filter(lambda row: row[0]!='#', file),
-                delimiter=' ',
-                skipinitialspace=True)
+        for row in self._read():
+            _code = self._parse_code(row[0])
 
-            for row in reader:
-                _code = self._parse_code(row[0])
-
-                picks[_code]['P'] = float(row[7])
-                picks[_code]['S'] = float(row[9])
+            picks[_code]['P'] = float(row[7])
+            picks[_code]['S'] = float(row[9])
 
         return picks
 
@@ -91,22 +86,16 @@ class WeightParser(object):
     def parse_statics(self):
         statics = defaultdict(AttribDict)
 
-        with open(self._path) as file:
-            reader = csv.reader(
-                filter(lambda row: row[0]!='#', file),
-                delimiter=' ',
-                skipinitialspace=True)
-
-            for row in reader:
-                _code = self._parse_code(row[0])
+        for row in self._read():
+            _code = self._parse_code(row[0])
 
-                # CAPUAF does not implement body-wave statics
-                statics[_code]['body_wave_Z'] = 0.
-                statics[_code]['body_wave_R'] = 0.
+            # CAPUAF does not implement body-wave statics
+            statics[_code]['body_wave_Z'] = 0.
+            statics[_code]['body_wave_R'] = 0.
 
-                statics[_code]['surface_wave_Z'] = float(row[11])
-                statics[_code]['surface_wave_R'] = float(row[11])
-                statics[_code]['surface_wave_T'] = float(row[12])
+            statics[_code]['surface_wave_Z'] = float(row[11])
+            statics[_code]['surface_wave_R'] = float(row[11])
+            statics[_code]['surface_wave_T'] = float(row[12])
 
         return statics
 
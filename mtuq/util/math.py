@@ -32,12 +32,11 @@ def correlate(v1, v2):
 
 
 def wrap_180(angle_in_deg):
-    """ Wraps angle to (-180, 180)
+    """ Wraps angle to (-180, 180]
     """
-    angle_in_deg %= 360.
-    idx = np.where(angle_in_deg > 180.)
-    angle_in_deg[idx] -= 360.
-    return angle_in_deg
+    # branchless form, which works for scalars as well as arrays and leaves
+    # input arrays unmodified
+    return 180. - (180. - np.asarray(angle_in_deg)) % 360.
 
 
 #
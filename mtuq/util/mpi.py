@@ -0,0 +1,196 @@
+
+import numpy as np
+
+
+def bcast_traces(comm, container, root=0, shared=False):
+    """ Broadcasts a `Dataset` or `GreensTensorList` from the root process
+
+    Numeric trace data are collected into a single contiguous buffer, which is
+    sent using uppercase ``Bcast``.  Only stream and trace metadata go
+    through pickle-based lowercase ``bcast``, which is much slower for large
+    amounts of numeric data.
+
+    On non-root processes, trace data are views into the received buffer.
+
+    .. note ::
+
+      Trace data are sent in double precision.  Casting to single precision
+      would halve the message size, but the level0 and level1 misfit
+      functions correlate traces in their own precision before evaluating
+      `s^2 + d^2 - 2sd`, which is prone to cancellation.
+
+    .. rubric :: Input arguments
+
+    ``comm`` (`mpi4py.MPI.Comm`):
+    MPI communicator
+
+    ``container`` (`mtuq.Dataset` or `mtuq.GreensTensorList`):
+    Traces to be broadcast (ignored on non-root processes)
+
+    ``shared`` (`bool`):
+    If `True`, the buffer is received only once per compute node, into
+    MPI-3 shared memory, and all non-root processes on a node view the same
+    read-only copy, which reduces memory use when many processes run on one
+    node
+
+    """
+    return bcast_traces_multi(comm, [container], root, shared)[0]
+
+
+def bcast_traces_multi(comm, containers, root=0, shared=False):
+    """ Broadcasts several `Dataset` or `GreensTensorList` objects at once
+
+    Same as ``bcast_traces``, except that traces from all containers are
+    packed into one buffer, so that only two messages are sent in total,
+    rather than two per container.
+
+    Returns a `list` of containers.
+    """
+    if comm.rank==root:
+        traces = _get_traces(containers)
+        npts = [trace.data.size for trace in traces]
+        dtypes = [trace.data.dtype for trace in traces]
+
+        buffer = np.empty(sum(npts))
+        for trace, (start, stop) in zip(traces, _ranges(npts)):
+            buffer[start:stop] = trace.data
+
+        # temporarily detach numeric data, so only metadata get pickled
+        arrays = [trace.data for trace in traces]
+        for trace in traces:
+            trace.data = np.empty(0, dtype=trace.data.dtype)
+
+        comm.bcast((containers, npts, dtypes), root=root)
+
+        for trace, array in zip(traces, arrays):
+            trace.data = array
+
+    else:
+        containers, npts, dtypes = comm.bcast(None, root=root)
+        traces = _get_traces(containers)
+        buffer = None
+
+    if shared:
+        buffer = _bcast_shared(comm, buffer, sum(npts), root)
+
+    else:
+        if buffer is None:
+            buffer = np.empty(sum(npts))
+        comm.Bcast(buffer, root=root)
+
+    if comm.rank!=root:
+        for trace, dtype, (start, stop) in zip(traces, dtypes, _ranges(npts)):
+            trace.data = buffer[start:stop].astype(dtype, copy=False)
+
+    return list(containers)
+
+
+def gather_rows(comm, array, root=0):
+    """ Gathers 2D arrays from all processes by stacking their rows
+
+    Uses uppercase ``Gatherv``, avoiding the pickling overhead and extra
+    copies of lowercase ``gather`` followed by ``np.concatenate``.
+
+    Returns the stacked array on the root process and ``None`` elsewhere.
+    """
+    from mpi4py import MPI
+
+    array = np.ascontiguousarray(array, dtype=np.float64)
+    counts = comm.gather(array.size, root=root)
+
+    if comm.rank==root:
+        counts = np.array(counts)
+        displs = np.cumsum(counts) - counts
+        stacked = np.empty((int(counts.sum()/array.shape[1]), array.shape[1]))
+        comm.Gatherv(array, [stacked, counts, displs, MPI.DOUBLE], root=root)
+        return stacked
+
+    else:
+        comm.Gatherv(array, None, root=root)
+
+
+def allreduce_argmin(comm, values, offset=0):
+    """ Returns global minimum and corresponding global index
+
+    Each process only sends a (value, index) pair, so this is much cheaper
+    than gathering all values when only the best grid point is needed.
+
+    .. rubric :: Input arguments
+
+    ``comm`` (`mpi4py.MPI.Comm`):
+    MPI communicator
+
+    ``values`` (`numpy.ndarray`):
+    Values held by the current process
+
+    ``offset`` (`int`):
+    Global index of the first value held by the current process
+    (e.g. ``start`` attribute of a partitioned grid)
+
+    """
+    from mpi4py import MPI
+
+    values = np.asarray(values).flatten()
+
+    if values.size > 0:
+        local = (values.min(), int(values.argmin()) + offset)
+    else:
+        local = (np.inf, -1)
+
+    return comm.allreduce(local, op=MPI.MINLOC)
+
+
+def _bcast_shared(comm, buffer, size, root):
+    """ Broadcasts buffer into memory shared by all processes on a node
+    """
+    from mpi4py import MPI
+
+    # groups processes by node, in such a way that root is the lowest ranked
+    # process on its node
+    key = 0 if comm.rank==root else comm.rank+1
+    node_comm = comm.Split_type(MPI.COMM_TYPE_SHARED, key=key)
+    is_leader = (node_comm.rank==0)
+
+    # only one process per node allocates memory
+    itemsize = np.dtype(np.float64).itemsize
+    window = MPI.Win.Allocate_shared(
+        size*itemsize if is_leader else 0, itemsize, comm=node_comm)
+    memory, _ = window.Shared_query(0)
+    shared = np.ndarray(buffer=memory, dtype=np.float64, shape=(size,))
+
+    # broadcasts between nodes (root has rank 0 within leader_comm, since
+    # it has the lowest key)
+    leader_comm = comm.Split(0 if is_leader else MPI.UNDEFINED, key)
+    if is_leader:
+        if comm.rank==root:
+            shared[:] = buffer
+        leader_comm.Bcast(shared, root=0)
+        leader_comm.Free()
+
+    node_comm.Barrier()
+    node_comm.Free()
+
+    # shared memory must remain allocated for as long as traces refer to it
+    _windows.append(window)
+
+    shared.flags.writeable = False
+    return shared
+
+
+_windows = []
+
+
+def _get_traces(containers):
+    traces = []
+    for container in containers:
+        for stream in container:
+            for trace in stream:
+                traces += [trace]
+    return traces
+
+
+def _ranges(npts):
+    stop = np.cumsum(npts)
+    start = stop - npts
+    return zip(start, stop)
+
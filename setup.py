@@ -19,13 +19,32 @@ def get_compile_args():
     if compiler.endswith("icc"):
         compile_args += ['-fast']
         compile_args += ['-march=native']
+        compile_args += ['-qopenmp']
     else:
         compile_args += ['-Ofast']
         compile_args += ['-march=native']
+        compile_args += ['-fopenmp']
 
     return compile_args
 
 
+def get_link_args():
+    compiler = ''
+    link_args = []
+
+    try:
+        compiler = os.environ["CC"]
+    except KeyError:
+        pass
+
+    if compiler.endswith("icc"):
+        link_args += ['-qopenmp']
+    else:
+        link_args += ['-fopenmp']
+
+    return link_args
+
+
 class PyTest(test_command):
     user_options = [('pytest-args=', 'a', "Arguments to pass to py.test")]
 
@@ -94,7 +113,8 @@ setup(
         Extension(
             'mtuq.misfit.c_ext_L2', ['mtuq/misfit/c_ext_L2.c'],
             include_dirs=[numpy.get_include()],
-            extra_compile_args=get_compile_args()),
+            extra_compile_args=get_compile_args(),
+            extra_link_args=get_link_args()),
     ],
 )
 
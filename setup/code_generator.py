@@ -372,6 +372,27 @@ MisfitDefinitions="""
 
 
 
+MisfitDefinitions_L1="""
+    # the L1 norm cannot be evaluated from cross-correlations alone, so it
+    # takes a separate path through the Python/C implementation
+    misfit_bw_L1 = Misfit(
+        norm='L1',
+        time_shift_min=-2.,
+        time_shift_max=+2.,
+        time_shift_groups=['ZR'],
+        )
+
+    misfit_sw_L1 = Misfit(
+        norm='L1',
+        time_shift_min=-10.,
+        time_shift_max=+10.,
+        time_shift_groups=['ZR','T'],
+        )
+
+"""
+
+
+
 WeightsComments="""
     #
     # User-supplied weights control how much each station contributes to the
@@ -550,6 +571,7 @@ Grid_BenchmarkCAP="""
 
 Main_GridSearch_DoubleCouple="""
     from mpi4py import MPI
+    from mtuq.util.mpi import bcast_traces_multi
     comm = MPI.COMM_WORLD
 
 
@@ -592,10 +614,8 @@ Main_GridSearch_DoubleCouple="""
 
 
     stations = comm.bcast(stations, root=0)
-    data_bw = comm.bcast(data_bw, root=0)
-    data_sw = comm.bcast(data_sw, root=0)
-    greens_bw = comm.bcast(greens_bw, root=0)
-    greens_sw = comm.bcast(greens_sw, root=0)
+    data_bw, data_sw, greens_bw, greens_sw = bcast_traces_multi(
+        comm, [data_bw, data_sw, greens_bw, greens_sw])
 
 
     #
@@ -633,6 +653,7 @@ Main_GridSearch_DoubleCoupleMagnitudeDepth="""
     #
 
     from mpi4py import MPI
+    from mtuq.util.mpi import bcast_traces_multi
     comm = MPI.COMM_WORLD
     rank = comm.rank
     nproc = comm.Get_size()
@@ -673,10 +694,8 @@ Main_GridSearch_DoubleCoupleMagnitudeDepth="""
 
 
     stations = comm.bcast(stations, root=0)
-    data_bw = comm.bcast(data_bw, root=0)
-    data_sw = comm.bcast(data_sw, root=0)
-    greens_bw = comm.bcast(greens_bw, root=0)
-    greens_sw = comm.bcast(greens_sw, root=0)
+    data_bw, data_sw, greens_bw, greens_sw = bcast_traces_multi(
+        comm, [data_bw, data_sw, greens_bw, greens_sw])
 
 
     #
@@ -930,6 +949,33 @@ Main_TestMisfit="""
     assert results_0.argmin()==results_1.argmin()==results_2.argmin()
 
 
+    #
+    # L1 norm (optimization_level=1 is omitted, since it does not support
+    # the L1 norm)
+    #
+
+    for label, misfit, data, greens in (
+        ('body wave', misfit_bw_L1, data_bw, greens_bw),
+        ('surface wave', misfit_sw_L1, data_sw, greens_sw)):
+
+        print('Evaluating %s L1 misfit...\\n' % label)
+
+        results_0 = misfit(
+            data, greens, grid, optimization_level=0)
+
+        results_2 = misfit(
+            data, greens, grid, optimization_level=2)
+
+        print('  optimization level:  0\\n', 
+              '  argmin:  %d\\n' % results_0.argmin(), 
+              '  min:     %e\\n\\n' % results_0.min())
+
+        print('  optimization level:  2\\n', 
+              '  argmin:  %d\\n' % results_2.argmin(), 
+              '  min:     %e\\n\\n' % results_2.min())
+
+        assert results_0.argmin()==results_2.argmin()
+        assert np.allclose(results_0, results_2, rtol=1.e-3, atol=0.)
 """
 
 
@@ -1052,7 +1098,7 @@ WrapUp_TestGridSearch_DoubleCoupleMagnitudeDepth="""
 
     if run_figures:
         filename = event_id+'_misfit_vs_depth.png'
-        #misfit_vs_depth(filename, best_misfit)
+        misfit_vs_depth(filename, data_bw, misfit_bw, origins, grid, results_bw)
 
     if run_checks:
         pass
@@ -1277,7 +1323,7 @@ if __name__=='__main__':
             replace(
             Imports,
             'plot_beachball',
-            'plot_misfit_depth',
+            'plot_misfit_depth, misfit_vs_depth',
             ))
         file.write(Docstring_TestGridSearch_DoubleCoupleMagnitudeDepth)
         file.write(ArgparseDefinitions)
@@ -1313,6 +1359,7 @@ if __name__=='__main__':
             'FK_database=path_greens,',
             ))
         file.write(MisfitDefinitions)
+        file.write(MisfitDefinitions_L1)
         file.write(WeightsComments)
         file.write(WeightsDefinitions)
         file.write(
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+
+#
+# Checks MPI reduction helpers against serial results
+#
+# Usage: mpirun -np 3 python check_mpi.py
+#
+
+import numpy as np
+from mpi4py import MPI
+from mtuq.util.mpi import allreduce_argmin, gather_rows
+
+
+if __name__=='__main__':
+    comm = MPI.COMM_WORLD
+    iproc, nproc = comm.rank, comm.size
+
+    # each process holds a contiguous block of rows of the same global array;
+    # the last process holds no rows, as can happen with uneven partitions
+    rng = np.random.RandomState(0)
+    nrows = 10*nproc
+    global_values = rng.rand(nrows, 1)
+
+    starts = [min(_i*10, nrows) for _i in range(nproc)]
+    stops = starts[1:] + [nrows]
+    if nproc > 1:
+        stops[-2] = nrows
+        starts[-1] = nrows
+    start, stop = starts[iproc], stops[iproc]
+    local_values = global_values[start:stop]
+
+
+    #
+    # allreduce_argmin returns the global minimum on every process
+    #
+    value, index = allreduce_argmin(comm, local_values, offset=start)
+
+    assert index==global_values.argmin()
+    assert value==global_values.min()
+
+
+    #
+    # gather_rows reassembles the global array on the root process
+    #
+    gathered = gather_rows(comm, local_values.reshape(-1, 1), root=0)
+
+    if iproc==0:
+        assert np.array_equal(gathered, global_values)
+    else:
+        assert gathered is None
+
+
+    if iproc==0:
+        print('SUCCESS\n')
+
@@ -4,7 +4,7 @@ import numpy as np
 
 from mtuq import read, open_db, download_greens_tensors
 from mtuq.event import Origin
-from mtuq.graphics import plot_data_greens2, plot_misfit_depth, plot_misfit_dc
+from mtuq.graphics import plot_data_greens2, plot_misfit_depth, misfit_vs_depth, plot_misfit_dc
 from mtuq.grid import DoubleCoupleGridRegular
 from mtuq.grid_search import grid_search
 from mtuq.misfit import Misfit
@@ -164,7 +164,7 @@ if __name__=='__main__':
 
     if run_figures:
         filename = event_id+'_misfit_vs_depth.png'
-        #misfit_vs_depth(filename, best_misfit)
+        misfit_vs_depth(filename, data_bw, misfit_bw, origins, grid, results_bw)
 
     if run_checks:
         pass
@@ -87,6 +87,23 @@ if __name__=='__main__':
         )
 
 
+    # the L1 norm cannot be evaluated from cross-correlations alone, so it
+    # takes a separate path through the Python/C implementation
+    misfit_bw_L1 = Misfit(
+        norm='L1',
+        time_shift_min=-2.,
+        time_shift_max=+2.,
+        time_shift_groups=['ZR'],
+        )
+
+    misfit_sw_L1 = Misfit(
+        norm='L1',
+        time_shift_min=-10.,
+        time_shift_max=+10.,
+        time_shift_groups=['ZR','T'],
+        )
+
+
     #
     # User-supplied weights control how much each station contributes to the
     # objective function
@@ -205,3 +222,30 @@ if __name__=='__main__':
     assert results_0.argmin()==results_1.argmin()==results_2.argmin()
 
 
+    #
+    # L1 norm (optimization_level=1 is omitted, since it does not support
+    # the L1 norm)
+    #
+
+    for label, misfit, data, greens in (
+        ('body wave', misfit_bw_L1, data_bw, greens_bw),
+        ('surface wave', misfit_sw_L1, data_sw, greens_sw)):
+
+        print('Evaluating %s L1 misfit...\n' % label)
+
+        results_0 = misfit(
+            data, greens, grid, optimization_level=0)
+
+        results_2 = misfit(
+            data, greens, grid, optimization_level=2)
+
+        print('  optimization level:  0\n', 
+              '  argmin:  %d\n' % results_0.argmin(), 
+              '  min:     %e\n\n' % results_0.min())
+
+        print('  optimization level:  2\n', 
+              '  argmin:  %d\n' % results_2.argmin(), 
+              '  min:     %e\n\n' % results_2.min())
+
+        assert results_0.argmin()==results_2.argmin()
+        assert np.allclose(results_0, results_2, rtol=1.e-3, atol=0.)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+
+
+import unittest
+import numpy as np
+import pandas
+
+from mtuq.graphics.uq.force import _bin
+from mtuq.util.math import closed_interval
+
+
+def _bin_reference(df, handle, npts_phi=60, npts_h=30):
+    # bins one cell at a time, as the original implementation did
+    phi = closed_interval(0., 360, npts_phi+1)
+    h = closed_interval(-1., +1., npts_h+1)
+
+    binned = np.empty((npts_h, npts_phi))
+    for _i in range(npts_h):
+        for _j in range(npts_phi):
+            subset = df.loc[
+                df['phi'].between(phi[_j], phi[_j+1]) &
+                df['h'].between(h[_i], h[_i+1])]
+
+            binned[_i, _j] = handle(subset[0])
+
+    return binned.transpose()
+
+
+def _random_forces(npts, seed=0):
+    rng = np.random.RandomState(seed)
+    return rng.uniform(0., 360., npts), rng.uniform(-1., +1., npts)
+
+
+def _regular_forces(npts_phi, npts_h):
+    # every point lies on a cell edge, including phi=0, phi=360, h=-1, h=+1
+    phi, h = np.meshgrid(
+        closed_interval(0., 360, npts_phi+1),
+        closed_interval(-1., +1., npts_h+1))
+    return phi.flatten(), h.flatten()
+
+
+class TestBin(unittest.TestCase):
+
+    def _check(self, phi, h, npts_phi, npts_h):
+        rng = np.random.RandomState(1)
+        df = pandas.DataFrame({
+            'phi': phi, 'h': h, 0: rng.rand(len(phi))})
+
+        for handle in (
+            lambda df: df.min(),
+            lambda df: df.max(),
+            lambda df: df.sum()/len(df)):
+
+            binned = _bin(df, handle, npts_phi=npts_phi, npts_h=npts_h)
+            reference = _bin_reference(df, handle,
+                npts_phi=npts_phi, npts_h=npts_h)
+
+            assert np.allclose(binned.values, reference, rtol=1.e-12, atol=0.)
+
+
+    def test_random_points(self):
+        phi, h = _random_forces(2000)
+        self._check(phi, h, npts_phi=12, npts_h=6)
+
+
+    def test_edge_points(self):
+        # points on an edge count toward both neighbouring cells
+        phi, h = _regular_forces(npts_phi=12, npts_h=6)
+        self._check(phi, h, npts_phi=12, npts_h=6)
+
+
+    def test_mixed_points(self):
+        # edge points from a coarser grid, plus points outside the edges,
+        # which count toward no cell
+        phi1, h1 = _random_forces(2000)
+        phi2, h2 = _regular_forces(npts_phi=6, npts_h=3)
+        phi3, h3 = np.array([-1., 361., 180.]), np.array([0., 0., 1.5])
+        self._check(
+            np.concatenate((phi1, phi2, phi3)),
+            np.concatenate((h1, h2, h3)),
+            npts_phi=12, npts_h=6)
+
+
+if __name__ == '__main__':
+    unittest.main()
+
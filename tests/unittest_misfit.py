@@ -1,11 +1,16 @@
 #!/usr/bin/env python
 
 
-import mtuq.misfit.simple
 import numpy as np
+import os
+import subprocess
+import sys
+import tempfile
 import unittest
 import obspy.core
 from mtuq.dataset import Dataset
+from mtuq.misfit import c_ext_L2
+from mtuq.misfit.level2 import _sum_groups
 from mtuq.util import AttribDict
 from mtuq.util.signal import pad
 from mtuq.wavelet import Gaussian
@@ -112,8 +117,135 @@ class test_misfit(unittest.TestCase):
         assert misfit1(dat, syn) <= misfit2(dat, syn)
 
 
+class test_c_ext_L2(unittest.TestCase):
+    def test_number_of_greens_functions(self):
+        """ Checks the C extension against a NumPy reference for 3 (force),
+            6 (moment tensor) and 9 (both) Green's functions
+        """
+        for ng in [3, 6, 9]:
+            inputs = _random_inputs(ng)
+            for norm in [0, 1, 2]:
+                results = _c_ext_L2_misfit(inputs, norm)
+                expected = _reference_misfit(inputs, norm)
+                assert np.allclose(results, expected, rtol=1.e-12, atol=0.)
+
+
+    def test_threads(self):
+        """ Checks that results do not depend on the number of OpenMP threads
+        """
+        results = []
+        for nthreads in [1, 4]:
+            results += [_c_ext_L2_misfit_subprocess(nthreads)]
+        assert np.array_equal(results[0], results[1])
+
+
+
 ### utility functions
 
+def _random_inputs(ng, seed=0, nsrc=50, nsta=4, nc=3, nt=20,
+    padding=(3, 2), dt=0.5):
+    """ Generates random input arrays for the C extension
+    """
+    rng = np.random.RandomState(seed)
+    npad = padding[0] + padding[1] + 1
+
+    data = rng.randn(nsta, nc, nt)
+    greens = rng.randn(nsta, nc, ng, nt+npad-1)
+    sources = rng.randn(nsrc, ng)
+
+    # combine Z,R and leave T on its own, and assign one trace zero weight
+    groups = np.array([[1., 1., 0.], [0., 0., 1.]])
+    weights = np.ones((nsta, nc))
+    weights[1, 2] = 0.
+
+    # cross-correlations, computed the same way as in level2, but with a
+    # Green's function autocorrelation that is symmetric and large enough
+    # for s^2 + d^2 - 2sd to be positive, as the hybrid norm requires
+    data_data = np.sum(data**2, axis=2) + 1.e3
+    greens_data = np.zeros((nsta, nc, ng, npad))
+    for it in range(npad):
+        greens_data[..., it] = np.einsum('scjt,sct->scj',
+            greens[..., it:it+nt], data)
+    greens_greens = rng.rand(nsta, nc, npad, ng, ng)
+    greens_greens += greens_greens.transpose(0, 1, 2, 4, 3)
+
+    return dict(data=data, greens=greens, data_data=data_data,
+        greens_data=greens_data,
+        greens_data_grouped=_sum_groups(greens_data, groups, weights),
+        greens_greens=greens_greens, sources=sources, groups=groups,
+        weights=weights, padding=padding, dt=dt)
+
+
+def _c_ext_L2_misfit(inputs, norm):
+    return c_ext_L2.misfit(
+        inputs['data'], inputs['greens'],
+        inputs['data_data'], inputs['greens_data'],
+        inputs['greens_data_grouped'], inputs['greens_greens'],
+        inputs['sources'], inputs['groups'], inputs['weights'],
+        norm, inputs['dt'], inputs['padding'][0], inputs['padding'][1],
+        0, 0, 0, 0)
+
+
+def _c_ext_L2_misfit_subprocess(nthreads):
+    """ Evaluates misfit in a separate process, since the number of OpenMP
+        threads is fixed once the runtime has started
+    """
+    script = '\n'.join([
+        'import sys, numpy as np',
+        'sys.path.insert(0, %r)' % os.path.dirname(os.path.abspath(__file__)),
+        'from unittest_misfit import _random_inputs, _c_ext_L2_misfit',
+        'inputs = _random_inputs(6, nsrc=1000)',
+        'np.save(sys.argv[1], np.hstack([',
+        '    _c_ext_L2_misfit(inputs, norm) for norm in [0, 1, 2]]))',
+        ])
+    env = dict(os.environ, OMP_NUM_THREADS=str(nthreads))
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename = os.path.join(tmpdir, 'results.npy')
+        subprocess.check_call(
+            [sys.executable, '-c', script, filename], env=env)
+        return np.load(filename)
+
+
+def _reference_misfit(inputs, norm):
+    """ Straightforward NumPy evaluation of what the C extension computes
+    """
+    data, greens = inputs['data'], inputs['greens']
+    gd, gg = inputs['greens_data'], inputs['greens_greens']
+    sources, groups, weights = \
+        inputs['sources'], inputs['groups'], inputs['weights']
+    nsta, nc, nt = data.shape
+
+    results = np.zeros((len(sources), 1))
+    for isrc, s in enumerate(sources):
+        for ista in range(nsta):
+            for group in groups:
+                active = [ic for ic in range(nc)
+                    if group[ic] and weights[ista, ic]]
+                if not active:
+                    continue
+
+                # time shift maximizing the cross-correlation summed over
+                # the group
+                cc = sum(np.dot(s, gd[ista, ic]) for ic in active)
+                itpad = cc.argmax()
+
+                for ic in active:
+                    if norm==2:
+                        syn = np.dot(s, greens[ista, ic, :, itpad:itpad+nt])
+                        value = np.sum(abs(syn - data[ista, ic]))
+                    else:
+                        value = inputs['data_data'][ista, ic] +\
+                            np.dot(s, np.dot(gg[ista, ic, itpad], s)) -\
+                            2.*np.dot(s, gd[ista, ic, :, itpad])
+                        if norm==1:
+                            value = np.sqrt(value)
+
+                    results[isrc] += inputs['dt']*weights[ista, ic]*value
+
+    return results
+
+
+
 def Stream(*args, **kwargs):
     """ Overloads obspy Stream by seeting the "id" attribute, which 
         mtuq expects (normally this is done by dataset.reader)